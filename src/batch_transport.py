@@ -0,0 +1,213 @@
+"""
+Pickle-Free Transport of Generated Batches
+
+An `ImageBatch` stores a batch of (28, W) images of any widths and their digit labels in a
+single contiguous buffer, so it can be moved between processes through shared memory or any
+buffer-protocol object (bytes, bytearray, memoryview, mmap) without copying or pickling the
+arrays. The layout of the buffer is:
+
+- bytes [0, 64):  int64 header = (magic, N, total width, total digits, 0, 0, 0, 0)
+- offsets:        int64 array of N + 1 column offsets, image i covers the columns [offsets[i], offsets[i + 1]).
+- widths:         int32 array of the N widths.
+- label offsets:  int64 array of N + 1 offsets, the digits of image i are labels[label_offsets[i]:label_offsets[i + 1]].
+- labels:         int8 array of all the digits, without padding.
+- images:         float32 block of 28 * total width values, the (28, W) images stored one after the other.
+
+Every array starts at a 64-byte aligned offset, computed from the header, and every image is a
+contiguous (28, W) array, so the samples are read as views of the buffer.
+"""
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from constants import IMAGE_HEIGHT
+from shared_memory import align, open_shared_memory, unlink_shared_memory
+
+BATCH_MAGIC = 0x4D4E495354424154  # "MNISTBAT"
+BATCH_HEADER_SIZE = 64
+
+
+def _layout(num_images: int, num_columns: int, num_digits: int) -> Tuple[int, int, int, int, int, int]:
+    """
+    Computes the offsets of the arrays of a batch, and the size of its buffer.
+
+    Args:
+        num_images: Number of images of the batch.
+        num_columns: Total width of the images.
+        num_digits: Total number of digits of the labels.
+    Returns:
+        tuple: The offsets of the offsets, widths, label offsets, labels and images arrays, and the size in bytes.
+    """
+    offsets_offset = BATCH_HEADER_SIZE
+    widths_offset = align(offsets_offset + (num_images + 1) * 8)
+    label_offsets_offset = align(widths_offset + num_images * 4)
+    labels_offset = align(label_offsets_offset + (num_images + 1) * 8)
+    images_offset = align(labels_offset + num_digits)
+    size = images_offset + IMAGE_HEIGHT * num_columns * 4
+    return offsets_offset, widths_offset, label_offsets_offset, labels_offset, images_offset, size
+
+
+class ImageBatch:
+    """
+    A batch of variable-width images and their labels, stored in a single contiguous buffer.
+    """
+
+    def __init__(self, buffer: Union[bytearray, memoryview], shm: Optional[SharedMemory] = None):
+        """
+        Reads a batch from a buffer, without copying it. Use `pack` to create a batch.
+
+        Args:
+            buffer: A buffer written by `pack`.
+            shm: The shared memory block of the buffer, if any.
+        """
+        self._buffer = buffer
+        self._shm = shm
+        header = np.ndarray((BATCH_HEADER_SIZE // 8,), dtype="int64", buffer=buffer)
+        if header[0] != BATCH_MAGIC:
+            raise ValueError("The buffer doesn't contain an image batch.")
+        num_images, num_columns, num_digits = header[1:4].tolist()
+        offsets_offset, widths_offset, label_offsets_offset, labels_offset, images_offset, _ = \
+            _layout(num_images, num_columns, num_digits)
+
+        self.offsets = np.ndarray((num_images + 1,), dtype="int64", buffer=buffer, offset=offsets_offset)
+        self.widths = np.ndarray((num_images,), dtype="int32", buffer=buffer, offset=widths_offset)
+        self.label_offsets = np.ndarray((num_images + 1,), dtype="int64", buffer=buffer, offset=label_offsets_offset)
+        self.labels = np.ndarray((num_digits,), dtype="int8", buffer=buffer, offset=labels_offset)
+        self.images = np.ndarray((IMAGE_HEIGHT * num_columns,), dtype="float32", buffer=buffer, offset=images_offset)
+
+    @staticmethod
+    def nbytes_for(images: Sequence[np.ndarray], labels: Sequence[Sequence[int]]) -> int:
+        """
+        Returns the size of the buffer needed to pack a batch.
+
+        Args:
+            images: (28, W) images of the batch.
+            labels: Digits of each image.
+        Returns:
+            int: The size in bytes.
+        """
+        return _layout(len(images), sum(image.shape[1] for image in images), sum(len(label) for label in labels))[-1]
+
+    @classmethod
+    def pack(cls, images: Sequence[np.ndarray], labels: Sequence[Sequence[int]],
+             buffer: Optional[Union[bytearray, memoryview]] = None,
+             shared_memory_name: Optional[str] = None) -> "ImageBatch":
+        """
+        Packs images and labels into a buffer, with a single copy of each image.
+
+        Args:
+            images: (28, W) images of the batch.
+            labels: Digits of each image.
+            buffer: Optional writable buffer of at least `nbytes_for(images, labels)` bytes.
+            shared_memory_name: If given, the batch is packed into a new shared memory block with this
+                                name, which another process can attach with `attach`.
+        Returns:
+            ImageBatch: The packed batch.
+        Raises:
+            ValueError: If the images are not (28, W) arrays, or if the buffer is too small.
+        """
+        if len(images) != len(labels):
+            raise ValueError("The images and labels should have the same length.")
+        # Validating the images before creating the shared memory block, which is not tracked
+        for image in images:
+            if np.ndim(image) != 2 or np.shape(image)[0] != IMAGE_HEIGHT:
+                raise ValueError(f"The images should be (28, W) arrays, got the shape: {np.shape(image)}")
+        widths = np.array([image.shape[1] for image in images], dtype="int32")
+        label_sizes = np.array([len(label) for label in labels], dtype="int64")
+        size = _layout(len(images), int(widths.sum()), int(label_sizes.sum()))[-1]
+
+        shm = None
+        if shared_memory_name is not None:
+            shm = open_shared_memory(shared_memory_name, size=size, create=True)
+            buffer = shm.buf
+        elif buffer is None:
+            buffer = bytearray(size)
+        elif memoryview(buffer).nbytes < size:
+            raise ValueError(f"The buffer should contain at least {size} bytes.")
+
+        header = np.ndarray((BATCH_HEADER_SIZE // 8,), dtype="int64", buffer=buffer)
+        header[:] = (BATCH_MAGIC, len(images), widths.sum(), label_sizes.sum(), 0, 0, 0, 0)
+        del header
+        batch = cls(buffer, shm)
+        try:
+            batch.widths[:] = widths
+            batch.offsets[0] = batch.label_offsets[0] = 0
+            np.cumsum(widths, out=batch.offsets[1:])
+            np.cumsum(label_sizes, out=batch.label_offsets[1:])
+            for i, (image, label) in enumerate(zip(images, labels)):
+                batch.image(i)[:] = image
+                batch.labels[batch.label_offsets[i]:batch.label_offsets[i + 1]] = label
+        except BaseException:
+            # The shared memory block would outlive the process if not destroyed
+            batch.unlink()
+            batch.close()
+            raise
+        return batch
+
+    @classmethod
+    def attach(cls, name: str) -> "ImageBatch":
+        """
+        Attaches a batch packed into a shared memory block, without copying it.
+
+        Args:
+            name: Name of the shared memory block.
+        Returns:
+            ImageBatch: The batch.
+        """
+        shm = open_shared_memory(name)
+        return cls(shm.buf, shm)
+
+    def __len__(self) -> int:
+        return len(self.widths)
+
+    def image(self, idx: int) -> np.ndarray:
+        """
+        Returns a (28, W) view of an image of the batch.
+        """
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        return self.images[IMAGE_HEIGHT * start:IMAGE_HEIGHT * end].reshape(IMAGE_HEIGHT, end - start)
+
+    def label(self, idx: int) -> np.ndarray:
+        """
+        Returns a view of the digits of an image of the batch.
+        """
+        return self.labels[self.label_offsets[idx]:self.label_offsets[idx + 1]]
+
+    def __getitem__(self, idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        if not -len(self) <= idx < len(self):
+            raise IndexError(f"Index {idx} is out of range for a batch of {len(self)} images.")
+        idx %= len(self)
+        return self.image(idx), self.label(idx)
+
+    @property
+    def buffer(self) -> memoryview:
+        """
+        The buffer of the batch, which can be sent to another process and read with `ImageBatch(buffer)`.
+        """
+        return memoryview(self._buffer)[:_layout(len(self), len(self.images) // IMAGE_HEIGHT, len(self.labels))[-1]]
+
+    @property
+    def name(self) -> Optional[str]:
+        """
+        Name of the shared memory block of the batch, if any.
+        """
+        return None if self._shm is None else self._shm.name
+
+    def close(self) -> None:
+        """
+        Detaches the shared memory block of the batch, if any. The views returned by the
+        batch should not be used anymore.
+        """
+        # The views on the buffer should be released before closing the block
+        self.offsets = self.widths = self.label_offsets = self.labels = self.images = None
+        self._buffer = None
+        if self._shm is not None:
+            self._shm.close()
+
+    def unlink(self) -> None:
+        """
+        Destroys the shared memory block of the batch, once all the processes are done with it.
+        """
+        if self._shm is not None:
+            unlink_shared_memory(self._shm)
@@ -0,0 +1,102 @@
+"""
+Padded Batches of Variable-Width Images
+"""
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from constants import IMAGE_HEIGHT
+
+# Padding value of the batches, the white background of the images
+PAD_VALUE = 1.0
+
+
+def bucket_by_width(widths: Sequence[int], batch_size: int, shuffle: bool = False,
+                    rng: Optional[np.random.Generator] = None) -> List[np.ndarray]:
+    """
+    Groups the images of similar widths into the same batches, to minimise the padding.
+
+    Args:
+        widths: Width of each image.
+        batch_size: Maximum number of images in a batch.
+        shuffle: Shuffles the order of the batches (not their content) if True.
+        rng: Random number generator used to shuffle, a new unseeded one is created if not given.
+    Returns:
+        list: The indices of the images of each batch.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"The batch size should be greater than 0, got: {batch_size}")
+    order = np.argsort(np.asarray(widths), kind="stable")
+    batches = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+    if shuffle:
+        rng = np.random.default_rng() if rng is None else rng
+        batches = [batches[i] for i in rng.permutation(len(batches))]
+    return batches
+
+
+def collate_batch(images: Sequence[np.ndarray], out: Optional[np.ndarray] = None,
+                  pad_value: float = PAD_VALUE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Packs (28, W) images of different widths into a padded (B, 28, max W) batch.
+
+    Args:
+        images: The images of the batch.
+        out: Optional preallocated C-contiguous float32 buffer, with at least B * 28 * max W elements.
+             The batch is a contiguous view of its beginning, so it is overwritten by the next call
+             with the same buffer.
+        pad_value: Value of the padding, at the right of each image.
+    Returns:
+        tuple: The (B, 28, max W) float32 batch and the int32 array of the widths of the images.
+    """
+    widths = np.array([image.shape[1] for image in images], dtype="int32")
+    shape = (len(images), IMAGE_HEIGHT, int(widths.max(initial=0)))
+    if out is None:
+        batch = np.empty(shape, dtype="float32")
+    else:
+        # A non-contiguous buffer would be copied by reshape, and the batch written into the copy
+        if out.dtype != np.float32 or out.size < np.prod(shape) or not out.flags["C_CONTIGUOUS"]:
+            raise ValueError(f"The buffer should be a C-contiguous float32 array with at least "
+                             f"{np.prod(shape)} elements.")
+        batch = out.reshape(-1)[:np.prod(shape)].reshape(shape)
+
+    for i, (image, width) in enumerate(zip(images, widths)):
+        batch[i, :, :width] = image
+        batch[i, :, width:] = pad_value
+    return batch, widths
+
+
+def padding_ratio(widths: Sequence[int]) -> float:
+    """
+    Returns the fraction of the padded batch which is padding.
+
+    Args:
+        widths: Widths of the images of the batch.
+    Returns:
+        float: The padding ratio, 0 if all the images have the same width.
+    """
+    widths = np.asarray(widths)
+    return 1.0 - widths.sum() / (len(widths) * widths.max()) if widths.size else 0.0
+
+
+def iter_padded_batches(images: Sequence[np.ndarray], batch_size: int, shuffle: bool = False,
+                        rng: Optional[np.random.Generator] = None
+                        ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Iterates over the width-bucketed padded batches of a list of images, reusing a single buffer.
+
+    Args:
+        images: (28, W) images of different widths.
+        batch_size: Maximum number of images in a batch.
+        shuffle: Shuffles the order of the batches if True.
+        rng: Random number generator used to shuffle.
+    Returns:
+        Iterator: The (batch, widths, indices) of each batch. The batch is overwritten by the next
+                  iteration, it should be copied (or consumed) before moving on.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"The batch size should be greater than 0, got: {batch_size}")
+    widths = np.array([image.shape[1] for image in images])
+    buffer = np.empty(min(batch_size, len(images)) * IMAGE_HEIGHT * int(widths.max(initial=0)), dtype="float32")
+    for indices in bucket_by_width(widths, batch_size, shuffle=shuffle, rng=rng):
+        batch, batch_widths = collate_batch([images[i] for i in indices], out=buffer)
+        yield batch, batch_widths, indices
@@ -0,0 +1,9 @@
+"""
+Constants
+
+Constants shared by the generation of the images and their in-memory layouts, kept in a
+module without dependencies so that importing them doesn't load the glyph bank.
+"""
+
+# Height of the generated images in pixels, the height of the MNIST glyphs
+IMAGE_HEIGHT = 28
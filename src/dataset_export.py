@@ -0,0 +1,216 @@
+"""
+In-Memory Dataset Export
+
+Generated datasets can be written straight into memory instead of PNG files, so that
+the training processes running on the same host can read the samples without decoding
+any image. Two layouts are supported:
+
+1. Memory-mapped `.npy` files, inside a directory:
+   - images.npy: float32 array of shape (N, 28, W), the generated images.
+   - labels.npy: int8 array of shape (N, 11), the digits of each image padded with -1.
+   - ready.npy:  int64 array of shape (1,), the ready-counter.
+   Consumers open them with `np.load(path, mmap_mode="r")` or with `NpyDataset.open`.
+
+2. A single `multiprocessing.shared_memory` block:
+   - bytes [0, 64):          int64 header = (magic, ready, N, 28, W, 11, labels offset, images offset)
+   - bytes [64, ...):        int8 labels array of shape (N, 11), padded with -1.
+   - images offset (64-byte aligned): float32 images array of shape (N, 28, W).
+   Consumers attach with `SharedMemoryDataset.attach(name)`.
+
+In both layouts the samples are written in order and the ready-counter is incremented
+after each sample is completely written, so the samples [0, ready) can be read while
+the generation is still filling the later slots.
+"""
+import os
+from multiprocessing.shared_memory import SharedMemory
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from constants import IMAGE_HEIGHT
+from number_plan import MAX_DIGITS
+from shared_memory import align, open_shared_memory, unlink_shared_memory
+
+SHM_MAGIC = 0x4D4E495354534551  # "MNISTSEQ"
+SHM_HEADER_SIZE = 64
+
+
+class NpyDataset:
+    """
+    A dataset stored in memory-mapped `.npy` files inside a directory.
+    """
+    IMAGES_FILE = "images.npy"
+    LABELS_FILE = "labels.npy"
+    READY_FILE = "ready.npy"
+
+    def __init__(self, images: np.ndarray, labels: np.ndarray, ready: np.ndarray):
+        self.images = images
+        self.labels = labels
+        self._ready = ready
+
+    @classmethod
+    def create(cls, path: str, num_images: int, image_width: int) -> "NpyDataset":
+        """
+        Creates the `.npy` files of an empty dataset.
+
+        Args:
+            path: Directory where the files should be created.
+            num_images: Number of images of the dataset.
+            image_width: Width of the images in pixels.
+        Returns:
+            NpyDataset: The dataset, opened for writing.
+        """
+        images = open_memmap(os.path.join(path, cls.IMAGES_FILE), mode="w+", dtype="float32",
+                             shape=(num_images, IMAGE_HEIGHT, image_width))
+        labels = open_memmap(os.path.join(path, cls.LABELS_FILE), mode="w+", dtype="int8",
+                             shape=(num_images, MAX_DIGITS))
+        labels[:] = -1
+        ready = open_memmap(os.path.join(path, cls.READY_FILE), mode="w+", dtype="int64", shape=(1,))
+        ready[0] = 0
+        return cls(images, labels, ready)
+
+    @classmethod
+    def open(cls, path: str) -> "NpyDataset":
+        """
+        Opens an existing dataset in read-only mode, without copying the data.
+
+        Args:
+            path: Directory containing the `.npy` files.
+        Returns:
+            NpyDataset: The dataset.
+        """
+        return cls(*(np.load(os.path.join(path, file), mmap_mode="r")
+                     for file in (cls.IMAGES_FILE, cls.LABELS_FILE, cls.READY_FILE)))
+
+    @property
+    def ready(self) -> int:
+        """
+        Number of samples completely written, from the start of the dataset.
+        """
+        return int(self._ready[0])
+
+    def write(self, idx: int, image: np.ndarray, digits: np.ndarray) -> None:
+        """
+        Writes a sample and marks it as ready. Samples should be written in order.
+
+        Args:
+            idx: Index of the sample.
+            image: (28, W) image of the sample.
+            digits: Digits of the sample, padded with -1 (at most 11 digits).
+        """
+        self.images[idx] = image
+        self.labels[idx, :len(digits)] = digits
+        self._ready[0] = idx + 1
+
+    def close(self) -> None:
+        """
+        Flushes the written samples to the disk.
+        """
+        for array in (self.images, self.labels, self._ready):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+
+class SharedMemoryDataset:
+    """
+    A dataset stored in a single `multiprocessing.shared_memory` block.
+    """
+
+    def __init__(self, shm: SharedMemory):
+        self._shm = shm
+        self._header = np.ndarray((SHM_HEADER_SIZE // 8,), dtype="int64", buffer=shm.buf)
+        if self._header[0] != SHM_MAGIC:
+            raise ValueError(f"The shared memory block '{shm.name}' doesn't contain a dataset.")
+        num_images, height, width, max_digits, labels_offset, images_offset = self._header[2:8].tolist()
+        self.labels = np.ndarray((num_images, max_digits), dtype="int8", buffer=shm.buf, offset=labels_offset)
+        self.images = np.ndarray((num_images, height, width), dtype="float32", buffer=shm.buf, offset=images_offset)
+
+    @staticmethod
+    def _layout(num_images: int, image_width: int) -> Tuple[int, int, int]:
+        """
+        Computes the offsets of the labels and images arrays, and the size of the block.
+
+        Args:
+            num_images: Number of images of the dataset.
+            image_width: Width of the images in pixels.
+        Returns:
+            tuple: The labels offset, the images offset and the total size in bytes.
+        """
+        labels_offset = SHM_HEADER_SIZE
+        images_offset = align(labels_offset + num_images * MAX_DIGITS)
+        size = images_offset + num_images * IMAGE_HEIGHT * image_width * 4
+        return labels_offset, images_offset, size
+
+    @classmethod
+    def create(cls, name: str, num_images: int, image_width: int) -> "SharedMemoryDataset":
+        """
+        Creates a shared memory block for an empty dataset.
+
+        Args:
+            name: Name of the shared memory block.
+            num_images: Number of images of the dataset.
+            image_width: Width of the images in pixels.
+        Returns:
+            SharedMemoryDataset: The dataset, opened for writing.
+        """
+        labels_offset, images_offset, size = cls._layout(num_images, image_width)
+        shm = open_shared_memory(name, size=size, create=True)
+        header = np.ndarray((SHM_HEADER_SIZE // 8,), dtype="int64", buffer=shm.buf)
+        header[:] = (SHM_MAGIC, 0, num_images, IMAGE_HEIGHT, image_width, MAX_DIGITS, labels_offset, images_offset)
+        dataset = cls(shm)
+        dataset.labels[:] = -1
+        return dataset
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedMemoryDataset":
+        """
+        Attaches an existing dataset, without copying the data.
+
+        Args:
+            name: Name of the shared memory block.
+        Returns:
+            SharedMemoryDataset: The dataset.
+        """
+        return cls(open_shared_memory(name))
+
+    @property
+    def name(self) -> str:
+        """
+        Name of the shared memory block.
+        """
+        return self._shm.name
+
+    @property
+    def ready(self) -> int:
+        """
+        Number of samples completely written, from the start of the dataset.
+        """
+        return int(self._header[1])
+
+    def write(self, idx: int, image: np.ndarray, digits: np.ndarray) -> None:
+        """
+        Writes a sample and marks it as ready. Samples should be written in order.
+
+        Args:
+            idx: Index of the sample.
+            image: (28, W) image of the sample.
+            digits: Digits of the sample, padded with -1 (at most 11 digits).
+        """
+        self.images[idx] = image
+        self.labels[idx, :len(digits)] = digits
+        self._header[1] = idx + 1
+
+    def close(self) -> None:
+        """
+        Detaches the shared memory block. The block itself is kept until `unlink` is called.
+        """
+        # The views on the buffer should be released before closing the block
+        self._header = self.labels = self.images = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """
+        Destroys the shared memory block, once all the processes are done with the dataset.
+        """
+        unlink_shared_memory(self._shm)
@@ -0,0 +1,94 @@
+"""
+Dataset-Level Glyph Metrics
+"""
+from typing import Optional
+
+import numpy as np
+
+# Largest height and width of the glyphs, so that their bounds fit in the int16 fields
+MAX_GLYPH_SIZE = np.iinfo("int16").max
+
+# Metrics of a glyph, all the bounds are inclusive pixel coordinates:
+#   x_min, x_max: First and last columns containing ink.
+#   y_min, y_max: First and last rows containing ink.
+#   width, height: Size of the bounding box of the ink, 0 for an empty glyph.
+#   ink_mass: Sum of the pixel values.
+#   centroid_x, centroid_y: Center of mass of the ink.
+GLYPH_METRICS_DTYPE = np.dtype([
+    ("x_min", "int16"), ("x_max", "int16"), ("y_min", "int16"), ("y_max", "int16"),
+    ("width", "int16"), ("height", "int16"), ("ink_mass", "uint32"),
+    ("centroid_x", "float32"), ("centroid_y", "float32"),
+])
+
+
+def _bounds(mask: np.ndarray) -> tuple:
+    """
+    Finds the first and last True positions of each row of a 2-D boolean mask.
+
+    Args:
+        mask: (N, L) boolean array.
+    Returns:
+        tuple: The first positions, last positions and sizes (last - first + 1),
+               all of them 0 for the rows without any True value.
+    """
+    not_empty = mask.any(axis=1)
+    first = np.argmax(mask, axis=1)
+    last = mask.shape[1] - 1 - np.argmax(mask[:, ::-1], axis=1)
+    size = np.where(not_empty, last - first + 1, 0)
+    return np.where(not_empty, first, 0), np.where(not_empty, last, 0), size
+
+
+def compute_glyph_metrics(glyphs: np.ndarray) -> np.ndarray:
+    """
+    Computes the metrics of all the glyphs at once, with a few array reductions.
+
+    Args:
+        glyphs: (N, H, W) array of glyphs, with the ink as non-zero values (like the MNIST images).
+                H and W should not be greater than `MAX_GLYPH_SIZE`.
+    Returns:
+        np.ndarray: A structured array of N records with the `GLYPH_METRICS_DTYPE` fields.
+    """
+    glyphs = np.asarray(glyphs)
+    if glyphs.ndim != 3:
+        raise ValueError(f"The glyphs should be a (N, H, W) array, got the shape: {glyphs.shape}")
+    if max(glyphs.shape[1:]) > MAX_GLYPH_SIZE:
+        raise ValueError(f"The glyphs should not be larger than {MAX_GLYPH_SIZE} pixels, got the shape: {glyphs.shape}")
+
+    # Ink of each column and each row of every glyph
+    column_mass = glyphs.sum(axis=1, dtype="uint32")
+    row_mass = glyphs.sum(axis=2, dtype="uint32")
+    ink_mass = column_mass.sum(axis=1, dtype="uint32")
+
+    metrics = np.zeros(len(glyphs), dtype=GLYPH_METRICS_DTYPE)
+    metrics["x_min"], metrics["x_max"], metrics["width"] = _bounds(column_mass > 0)
+    metrics["y_min"], metrics["y_max"], metrics["height"] = _bounds(row_mass > 0)
+    metrics["ink_mass"] = ink_mass
+
+    # Center of mass, left to 0 for the empty glyphs
+    safe_mass = np.maximum(ink_mass, 1).astype("float64")
+    metrics["centroid_x"] = column_mass @ np.arange(glyphs.shape[2], dtype="float64") / safe_mass
+    metrics["centroid_y"] = row_mass @ np.arange(glyphs.shape[1], dtype="float64") / safe_mass
+    return metrics
+
+
+def filter_glyphs(metrics: np.ndarray, min_width: Optional[int] = None, max_width: Optional[int] = None,
+                  min_ink_mass: Optional[int] = None, max_ink_mass: Optional[int] = None) -> np.ndarray:
+    """
+    Selects the glyphs whose metrics are inside the given limits (inclusive).
+
+    Args:
+        metrics: Structured array returned by `compute_glyph_metrics`.
+        min_width: Minimum width of the ink.
+        max_width: Maximum width of the ink.
+        min_ink_mass: Minimum ink mass.
+        max_ink_mass: Maximum ink mass.
+    Returns:
+        np.ndarray: A boolean mask of the selected glyphs.
+    """
+    mask = np.ones(len(metrics), dtype=bool)
+    for field, low, high in (("width", min_width, max_width), ("ink_mass", min_ink_mass, max_ink_mass)):
+        if low is not None:
+            mask &= metrics[field] >= low
+        if high is not None:
+            mask &= metrics[field] <= high
+    return mask
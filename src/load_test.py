@@ -0,0 +1,280 @@
+"""
+Scaling Load Test of the Phone Number Generation
+
+Runs the generation for every combination of worker count and dataset size, records the
+throughput (images/sec), the peak memory and the time spent in each stage, and compares
+the throughput against a stored baseline to catch the regressions of the generation engine.
+
+Note: this module uses `resource`, which is only available on POSIX systems.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from dataset_export import SharedMemoryDataset
+
+
+def _peak_memory_mb() -> float:
+    """
+    Returns the peak resident memory of the current process, in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _directory_size(path: str) -> int:
+    """
+    Returns the total size of the files inside a directory, in bytes.
+    """
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def config_key(num_workers: int, num_images: int) -> str:
+    """
+    Returns the key of a configuration, used in the reports and baselines.
+
+    Args:
+        num_workers: Number of worker processes.
+        num_images: Number of generated images.
+    Returns:
+        str: The key, like "workers=4,num_images=10000".
+    """
+    return f"workers={num_workers},num_images={num_images}"
+
+
+def _release_shared_memory(names: Sequence[str]) -> int:
+    """
+    Destroys the shared memory blocks written by the workers, skipping the ones which were never created.
+
+    Args:
+        names: Names of the shared memory blocks.
+    Returns:
+        int: The total size of the images and labels of the destroyed blocks, in bytes.
+    """
+    num_bytes = 0
+    for name in names:
+        try:
+            dataset = SharedMemoryDataset.attach(name)
+        except FileNotFoundError:
+            continue
+        num_bytes += dataset.images.nbytes + dataset.labels.nbytes
+        dataset.close()
+        dataset.unlink()
+    return num_bytes
+
+
+def reseed_global_rng(seed_sequence: np.random.SeedSequence) -> None:
+    """
+    Reseeds the global NumPy random number generator, which forked workers would share otherwise.
+
+    Args:
+        seed_sequence: Seed of the worker.
+    """
+    np.random.seed(seed_sequence.generate_state(1))
+
+
+def _run_worker(generate_fn: Callable, num_images: int, output_path: str, seed_sequence: np.random.SeedSequence,
+                reseed_fn: Callable[[np.random.SeedSequence], None]) -> dict:
+    """
+    Generates a share of the dataset inside a worker process.
+
+    Args:
+        generate_fn: Function generating the images, called with the `num_images`,
+                     `output_path` and `stage_times` keyword arguments.
+        num_images: Number of images generated by this worker.
+        output_path: Output directory (or shared memory block name) of this worker.
+        seed_sequence: Seed of this worker, different for every share of the dataset.
+        reseed_fn: Function reseeding the random number generators used by `generate_fn`.
+    Returns:
+        dict: The generation seconds, the seconds of each stage, the peak memory and the pid of the worker.
+    """
+    # Forked workers inherit the random number generators of the parent, in the same state
+    reseed_fn(seed_sequence)
+    stage_times = {}
+    start = time.perf_counter()
+    generate_fn(num_images=num_images, output_path=output_path, stage_times=stage_times)
+    return {"seconds": time.perf_counter() - start, "stage_times": stage_times, "peak_memory_mb": _peak_memory_mb(),
+            "pid": os.getpid()}
+
+
+def run_configuration(generate_fn: Callable, num_workers: int, num_images: int, output_format: str,
+                      work_dir: str, seed_sequence: Optional[np.random.SeedSequence] = None,
+                      reseed_fn: Callable[[np.random.SeedSequence], None] = reseed_global_rng) -> dict:
+    """
+    Generates `num_images` images split over `num_workers` worker processes.
+
+    Args:
+        generate_fn: Function generating the images, see `_run_worker`.
+        num_workers: Number of worker processes.
+        num_images: Total number of images.
+        output_format: "png", "npy" or "shm", used to prepare the output of each worker.
+        work_dir: Directory where the output directories of the workers are created.
+        seed_sequence: Seed of the configuration, from which the seeds of the workers are spawned.
+        reseed_fn: Function reseeding the random number generators of a worker, see `_run_worker`.
+    Returns:
+        dict: The measures of the configuration. The throughput is computed from the wall time,
+              which includes the start of the worker processes. `peak_memory_mb` is the peak memory
+              of the largest worker, and `total_peak_memory_mb` the sum of the peak memories of the
+              worker processes and the parent process (an upper bound, as the pages shared by the
+              fork are counted in every process).
+    """
+    # Splitting the images as evenly as possible between the workers
+    shares = [num_images // num_workers + (i < num_images % num_workers) for i in range(num_workers)]
+    shares = [share for share in shares if share > 0]
+    if output_format == "shm":
+        outputs = [f"load_test_{uuid.uuid4().hex[:12]}" for _ in shares]
+    else:
+        outputs = [tempfile.mkdtemp(dir=work_dir) for _ in shares]
+
+    # Forked workers inherit the glyph bank loaded by the parent process
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    output_bytes = 0
+    try:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=len(shares), mp_context=context) as executor:
+            seeds = (np.random.SeedSequence() if seed_sequence is None else seed_sequence).spawn(len(shares))
+            workers = list(executor.map(_run_worker, [generate_fn] * len(shares), shares, outputs, seeds,
+                                        [reseed_fn] * len(shares)))
+        wall_seconds = time.perf_counter() - start
+    finally:
+        # The shared memory blocks are not tracked, they are destroyed even if a worker failed
+        if output_format == "shm":
+            output_bytes = _release_shared_memory(outputs)
+    if output_format != "shm":
+        output_bytes = sum(_directory_size(path) for path in outputs)
+
+    # A process of the pool may run several shares, its peak memory is only counted once
+    process_peaks = {}
+    for worker in workers:
+        process_peaks[worker["pid"]] = max(process_peaks.get(worker["pid"], 0.0), worker["peak_memory_mb"])
+
+    stage_times = {}
+    for worker in workers:
+        for stage, seconds in worker["stage_times"].items():
+            stage_times[stage] = stage_times.get(stage, 0.0) + seconds
+    return {
+        "workers": num_workers,
+        "num_images": num_images,
+        # A process of the pool may run several shares one after the other, so the throughput
+        # is measured on the wall time rather than on the time of each share
+        "images_per_sec": num_images / wall_seconds,
+        "wall_seconds": wall_seconds,
+        "max_worker_seconds": max(worker["seconds"] for worker in workers),
+        "peak_memory_mb": max(worker["peak_memory_mb"] for worker in workers),
+        "total_peak_memory_mb": sum(process_peaks.values()) + _peak_memory_mb(),
+        "stage_seconds": stage_times,
+        "output_bytes": output_bytes,
+    }
+
+
+def run_load_test(generate_fn: Callable, worker_counts: Sequence[int], dataset_sizes: Sequence[int],
+                  output_format: str = "npy", warmup_fn: Optional[Callable] = None,
+                  reseed_fn: Callable[[np.random.SeedSequence], None] = reseed_global_rng,
+                  seed: Optional[int] = None, settings: Optional[Dict[str, Any]] = None,
+                  work_dir: Optional[str] = None) -> List[dict]:
+    """
+    Runs every combination of worker count and dataset size.
+
+    Args:
+        generate_fn: Function generating the images, see `_run_worker`. It should be picklable.
+        worker_counts: Numbers of worker processes.
+        dataset_sizes: Numbers of images.
+        output_format: "png", "npy" or "shm", the output format used by `generate_fn`.
+        warmup_fn: Optional function called once in the parent process before the runs,
+                   for example to load the glyph bank which is then inherited by the workers.
+        reseed_fn: Function reseeding the random number generators of a worker, see `_run_worker`.
+        seed: Optional root seed of the workers' seeds.
+        settings: Optional settings of `generate_fn` (like the image width and spacing range), stored
+                  with the measures together with the output format, see `compare_to_baseline`.
+        work_dir: Optional directory where the outputs of the workers are temporarily written,
+                  instead of the system temporary directory (which is often in memory).
+    Returns:
+        list: The measures of each configuration, see `run_configuration`.
+    """
+    if warmup_fn is not None:
+        warmup_fn()
+
+    # Normalized through JSON, so that they compare equal to the settings of a loaded baseline
+    settings = json.loads(json.dumps({"output_format": output_format, **(settings or {})}))
+    results = []
+    seed_sequence = np.random.SeedSequence(seed)
+    with tempfile.TemporaryDirectory(dir=work_dir) as outputs_dir:
+        for num_images in dataset_sizes:
+            for num_workers in worker_counts:
+                result = run_configuration(generate_fn, num_workers, num_images, output_format, outputs_dir,
+                                           seed_sequence=seed_sequence.spawn(1)[0], reseed_fn=reseed_fn)
+                result["settings"] = settings
+                logging.info("%s: %.1f images/sec, peak memory %.1f MiB per worker, %.1f MiB in total, stages %s",
+                             config_key(num_workers, num_images), result["images_per_sec"],
+                             result["peak_memory_mb"], result["total_peak_memory_mb"],
+                             {stage: round(seconds, 3) for stage, seconds in result["stage_seconds"].items()})
+                results.append(result)
+    return results
+
+
+def compare_to_baseline(results: List[dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    Compares the throughput of each configuration with the baseline.
+
+    Args:
+        results: Measures returned by `run_load_test`.
+        baseline: Baseline measures, keyed by `config_key`.
+        tolerance: Maximum accepted drop of the throughput, as a fraction (0.2 for 20%).
+    Returns:
+        list: A message for each configuration whose throughput dropped beyond the tolerance.
+              The configurations missing from the baseline are skipped.
+    Raises:
+        ValueError: If a configuration of the baseline was measured with other settings
+                    (output format, image width, spacing range...).
+    """
+    regressions = []
+    for result in results:
+        key = config_key(result["workers"], result["num_images"])
+        if key not in baseline:
+            continue
+        if baseline[key].get("settings") != result.get("settings"):
+            raise ValueError(f"{key}: the baseline was measured with the settings {baseline[key].get('settings')}, "
+                             f"not {result.get('settings')}. Save a new baseline for these settings.")
+        expected = baseline[key]["images_per_sec"]
+        if result["images_per_sec"] < expected * (1.0 - tolerance):
+            regressions.append(f"{key}: {result['images_per_sec']:.1f} images/sec, "
+                               f"baseline {expected:.1f} images/sec (tolerance {tolerance:.0%})")
+    return regressions
+
+
+def load_baseline(path: str) -> Dict[str, dict]:
+    """
+    Loads a baseline saved by `save_baseline`.
+
+    Args:
+        path: Path of the JSON file.
+    Returns:
+        dict: The baseline measures, keyed by `config_key`.
+    """
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_baseline(path: str, results: List[dict]) -> None:
+    """
+    Saves the measures of a load test as a baseline.
+
+    Args:
+        path: Path of the JSON file.
+        results: Measures returned by `run_load_test`.
+    """
+    baseline = {config_key(result["workers"], result["num_images"]): result for result in results}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(baseline, file, indent=2)
@@ -2,79 +2,30 @@
 Script for generating handwritten number sequence images using CLI
 """
 
+import functools
+import json
 import logging
 import os
-import random
-from typing import Tuple
+import re
+import time
+import uuid
+from typing import Dict, Optional, Sequence, Tuple
 
 import click
 import cv2
 import numpy as np
 from matplotlib import pyplot as plt
 from tqdm import tqdm
-from number_generator import generate_numbers_sequence
+from dataset_export import NpyDataset, SharedMemoryDataset
+from number_generator import DEFAULT_GENERATOR, generate_numbers_sequence, validate_image_width, validate_spacing_range
+from number_plan import DEFAULT_TYPE_WEIGHTS, JP_AREA_CODES, sample_phone_numbers, split_phone_number
 
 logging.basicConfig(level=logging.DEBUG)
 
+OUTPUT_FORMATS = ("png", "npy", "shm")
+# Valid names of the shared memory blocks, which are files of /dev/shm on Linux
+SHM_NAME_PATTERN = re.compile(r"\w[\w.-]*")
 
-def generate_area_code(phone_num_type: int, mobile_code: list) -> list:
-    """
-    Generates a sequence of area code according the phone number type
-
-    Args:
-        phone_num_type:
-        mobile_code:
-    Returns:
-        list: A list of sequence with 2-6 digits, starting with 0.
-    """
-    try:
-        _area_code = []
-        # If phone_num_type > 5, then select a mobile code as area code
-        if phone_num_type > 5:
-            _area_code = random.choice(mobile_code)
-        # If phone_num_type < 5, then create <phone_num_type> digit random sequence starting with 0
-        else:
-            _area_code += [0, *np.random.choice([*range(1, 10)], size=phone_num_type).tolist()]
-        return _area_code
-
-    except Exception as error:
-        logging.error("Error occurred generating the area code of phone number: %s", str(error))
-        raise ValueError("Area code of phone number generation failed.") from error
-
-def generate_exchange_number(exchange_number_size: int, is_mobile_number: bool) -> list:
-    """
-    Generates a sequence of exchange number according to size of area code type
-
-    Args:
-        exchange_number_size: Size of the exchange number.
-        is_mobile_number: Sequence is being generated for a mobile number or not.
-    Returns:
-        list: A list of sequence with 0-4 digits, depending upon the area code.
-    """
-    try:
-        # If the area code is a mobile-phone-code then exchange_number_size should be 4
-        exchange_number_size = (exchange_number_size, 4)[is_mobile_number]
-        exchange_number = (np.random.choice([*range(0, 10)], size=exchange_number_size)).tolist()
-        return exchange_number
-
-    except Exception as error:
-        logging.error('Error occurred generating the exchange-number of phone number: %s', str(error))
-        raise ValueError("Exchange-number of phone number generation failed.") from error
-
-def generate_subscriber_number() -> list:
-    """
-    Generates a sequence of 4 digit random subscriber number.
-
-    Returns:
-        list: A list of sequence with random 4 digits.
-    """
-    try:
-        subscriber_number = (np.random.choice([*range(0, 10)], size=4)).tolist()
-        return subscriber_number
-
-    except Exception as error:
-        logging.error('Error occurred generating the subscriber-number of phone number: %s', str(error))
-        raise ValueError("Subscriber-number of phone number generation failed.") from error
 
 def add_noise(image: np.ndarray, stddev_range: Tuple[int, int]=(0, 255)) -> np.ndarray:
     """
@@ -86,19 +37,15 @@ def add_noise(image: np.ndarray, stddev_range: Tuple[int, int]=(0, 255)) -> np.n
     Returns:
         np.ndarray: A noisy image array, with the same shape as the input image.
     """
-    try:
-        # Generate a random standard deviation for the Gaussian noise in the range [1, 200]
-        stddev = np.random.randint(stddev_range[0], stddev_range[1])
-        # Create a noise array with the same shape as the input image
-        noise = np.zeros(image.shape, np.float32)
-        # The mean is set to 255 so that the noise could be centered around a bright value
-        cv2.randn(noise, 255, stddev)
-        # Apply the normalized noise array to the original image, effectively adding the noise
-        noisy_img = cv2.bitwise_and(image, noise/255.0)
-        return noisy_img
-    except Exception as error:
-        logging.error('Error occurred adding the noise to the phone number image: %s', str(error))
-        raise ValueError("Noise adding operation failed.") from error
+    # Generate a random standard deviation for the Gaussian noise in the range [1, 200]
+    stddev = np.random.randint(stddev_range[0], stddev_range[1])
+    # Create a noise array with the same shape as the input image
+    noise = np.zeros(image.shape, np.float32)
+    # The mean is set to 255 so that the noise could be centered around a bright value
+    cv2.randn(noise, 255, stddev)
+    # Apply the normalized noise array to the original image, effectively adding the noise
+    noisy_img = cv2.bitwise_and(image, noise/255.0)
+    return noisy_img
 
 def combine_phone_number(area_code: list, exchange_number: list, subscriber_number: list,
                          writing_style_type: int, spacing_range:Tuple[int, int], img_width: int) -> np.ndarray:
@@ -117,59 +64,74 @@ def combine_phone_number(area_code: list, exchange_number: list, subscriber_numb
     Returns:
         np.ndarray: An image of phone number represented in float32 bits array, with user definer
                     width, user defined consecutive spaces and random part spaces (for style-2) if applicable.
+
+    Notes:
+        The arguments are not validated here, `generate_phone_number` validates them once for all the images.
     """
-    try:
-        _image = None
-        # Part space to be used for style-2.
-        #   Eg: 070 <min_part_space> 1234 <min_part_space> 5678
-        min_part_space = 25
-        combined_image = []
-
-        # Writing Style-1 Eg: 07012345678, 0211234567
-        if writing_style_type == 1:
-            sequence = area_code + exchange_number + subscriber_number
-            _image = generate_numbers_sequence(digits=sequence, spacing_range=spacing_range, image_width=img_width)
-            # Adding some white-space in the front and back
-            white_space = np.ones((28, np.random.randint(low=spacing_range[0], high=spacing_range[1]) + 5))
-            combined_image = [white_space, _image, white_space]
-
-        # Writing Style-2 Eg: 070 1234 5678, 021 123 4567
-        elif writing_style_type == 2:
-            # Generating the image of area code
-            area_code_image = generate_numbers_sequence(digits=area_code, spacing_range=spacing_range,
-                                                        image_width=28*len(area_code))
+    _image = None
+    # Part space to be used for style-2.
+    #   Eg: 070 <min_part_space> 1234 <min_part_space> 5678
+    min_part_space = 25
+    combined_image = []
+
+    # Writing Style-1 Eg: 07012345678, 0211234567
+    if writing_style_type == 1:
+        sequence = np.array(area_code + exchange_number + subscriber_number)
+        _image = DEFAULT_GENERATOR.render(sequence, spacing_range, img_width)
+        # Adding some white-space in the front and back
+        white_space = np.ones((28, np.random.randint(low=spacing_range[0], high=spacing_range[1]) + 5))
+        combined_image = [white_space, _image, white_space]
+
+    # Writing Style-2 Eg: 070 1234 5678, 021 123 4567
+    elif writing_style_type == 2:
+        # Generating the image of area code
+        area_code_image = DEFAULT_GENERATOR.render(np.array(area_code), spacing_range, 28*len(area_code))
+        # Generating the image for part space
+        part_space = np.ones((28, np.random.randint(low=spacing_range[0], high=spacing_range[1]) + min_part_space))
+        combined_image += [area_code_image, part_space]
+
+        if exchange_number:
+            # Generating the image of exchange number
+            exchange_number_image = DEFAULT_GENERATOR.render(np.array(exchange_number), spacing_range,
+                                                             28*len(exchange_number))
             # Generating the image for part space
-            part_space = np.ones((28, np.random.randint(low=spacing_range[0], high=spacing_range[1]) + min_part_space))
-            combined_image += [area_code_image, part_space]
-
-            if exchange_number:
-                # Generating the image of exchange number
-                exchange_number_image = generate_numbers_sequence(digits=exchange_number, spacing_range=spacing_range,
-                                                                  image_width=28*len(exchange_number))
-                # Generating the image for part space
-                part_space = np.ones((28, np.random.randint(low=spacing_range[0], high=spacing_range[1])+min_part_space))
-                combined_image += [exchange_number_image, part_space]
-
-            # Generating the image of a subscriber number
-            subscriber_number_image = generate_numbers_sequence(digits=subscriber_number, spacing_range=spacing_range,
-                                                                image_width=28*len(subscriber_number))
-            combined_image += [subscriber_number_image]
-
-            # Adding some white-space in the front and back
-            white_space = np.ones((28, np.random.randint(low=spacing_range[0], high=spacing_range[1]) + 5))
-            combined_image = [white_space]+combined_image+[white_space]
-
-        # Combining all the images
-        _image = np.concatenate(combined_image, axis=1, dtype='float32')
-        # Resizing to the user defined image width
-        _image = cv2.resize(_image, (img_width, 28))
-        return _image
-
-    except Exception as error:
-        logging.error("Error occurred during final number generation: %s", str(error))
-        raise ValueError("Final number generation failed.") from error
-
-def generate_phone_number(spacing_range: Tuple[int, int], image_width: int, output_path: str, num_images: int) -> None:
+            part_space = np.ones((28, np.random.randint(low=spacing_range[0], high=spacing_range[1])+min_part_space))
+            combined_image += [exchange_number_image, part_space]
+
+        # Generating the image of a subscriber number
+        subscriber_number_image = DEFAULT_GENERATOR.render(np.array(subscriber_number), spacing_range,
+                                                           28*len(subscriber_number))
+        combined_image += [subscriber_number_image]
+
+        # Adding some white-space in the front and back
+        white_space = np.ones((28, np.random.randint(low=spacing_range[0], high=spacing_range[1]) + 5))
+        combined_image = [white_space]+combined_image+[white_space]
+
+    # Combining all the images
+    _image = np.concatenate(combined_image, axis=1, dtype='float32')
+    # Resizing to the user defined image width
+    _image = cv2.resize(_image, (img_width, 28))
+    return _image
+
+def _reseed_worker(seed_sequence: np.random.SeedSequence) -> None:
+    """
+    Reseeds the random number generators of a load test worker, which are copied from the
+    parent process by the fork otherwise.
+
+    Args:
+        seed_sequence: Seed of the worker.
+    """
+    global_seed, generator_seed = seed_sequence.spawn(2)
+    # Used for the writing styles and the noise
+    np.random.seed(global_seed.generate_state(1))
+    # Used for the glyphs and the spaces
+    DEFAULT_GENERATOR.reseed(generator_seed)
+
+def generate_phone_number(spacing_range: Tuple[int, int], image_width: int, output_path: str, num_images: int,
+                          type_weights: Sequence[float] = DEFAULT_TYPE_WEIGHTS,
+                          area_codes: Optional[Dict[int, Sequence[str]]] = None,
+                          balanced_digits: bool = False, output_format: str = "png",
+                          stage_times: Optional[Dict[str, float]] = None, show_progress: bool = True) -> None:
     """
     Main function call for generating random Japanese phone numbers
     The phone numbers are generated in 3 parts and images are saved
@@ -182,45 +144,92 @@ def generate_phone_number(spacing_range: Tuple[int, int], image_width: int, outp
         image_width: Specifies the width of the image in pixels.
         output_path: Specifies the path where the generated image should be stored.
         num_images: Number of images to be generated
+        type_weights: Relative weights of the phone number types, see `number_plan.sample_phone_numbers`.
+        area_codes: Optional table of real area codes, like `number_plan.JP_AREA_CODES`.
+        balanced_digits: If True, every digit appears the same number of times in the dataset, as far as
+                         the fixed digits (leading 0, mobile codes) allow it.
+        output_format: "png" saves each image as a png file inside `output_path`. "npy" writes the whole
+                       dataset into memory-mapped .npy files inside `output_path`, and "shm" writes it into
+                       a shared memory block named `output_path`. See `dataset_export` for the layouts.
+        stage_times: Optional dictionary, where the seconds spent in each stage of the generation
+                     ("plan", "render", "noise" and "write") are added.
+        show_progress: Shows a progress bar if True.
     Returns:
         None: Saves N number of random Japanese phone number images at a given directory.
+    Raises:
+        InvalidSpacingError, InvalidWidthError: For an invalid spacing range or image width.
+        ValueError: For an invalid number of images, output format or shared memory block name.
+        FileNotFoundError: If the output directory doesn't exist.
+        FileExistsError: If the shared memory block already exists.
     """
+    # Validating all the arguments once, before generating the images
+    spacing_range = validate_spacing_range(spacing_range)
+    image_width = validate_image_width(image_width)
+    if num_images <= 0:
+        raise ValueError(f"The number of images should be greater than 0, got: {num_images}")
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"The output format should be one of {OUTPUT_FORMATS}, got: {output_format!r}")
+    if output_format == "shm" and not SHM_NAME_PATTERN.fullmatch(output_path):
+        raise ValueError(f"The shared memory block name should only contain letters, digits, '_', '-' and '.', "
+                         f"got: {output_path!r}")
+    if output_format != "shm" and not os.path.isdir(output_path):
+        raise FileNotFoundError(f"The output directory doesn't exist: {output_path}")
+
+    # Seconds spent in each stage of the generation
+    timings = {"plan": 0.0, "render": 0.0, "noise": 0.0, "write": 0.0}
+    start = time.perf_counter()
+
+    # Generating the digits of all the phone numbers at once
+    digits, part_sizes = sample_phone_numbers(num_images, type_weights=type_weights, area_codes=area_codes,
+                                              balanced_digits=balanced_digits)
+    # Randomly selecting the writing style to be used for each phone number
+    style_type  = np.random.choice([1, 2], size=num_images)
+
+    # Creating the in-memory dataset, if the images are not saved as png files
+    dataset = None
+    if output_format == "npy":
+        dataset = NpyDataset.create(output_path, num_images, image_width)
+    elif output_format == "shm":
+        dataset = SharedMemoryDataset.create(output_path, num_images, image_width)
+    timings["plan"] += time.perf_counter() - start
 
     try:
-        # Randomly selecting the type of phone numbers to be generated
-        phone_number_type = np.random.choice([*range(1, 10)], size=num_images)
-        # Randomly selecting the writing style to be used for each phone number
-        style_type  = np.random.choice([1, 2], size=num_images)
-        # Predefining the mobile number code
-        mobile_code = [[0, 7, 0], [0, 8, 0], [0, 9, 0]]
-
-        # Generating N number of random phone numbers iteratively
-        for i in tqdm(range(num_images)):
-            # Generating the area code - part(1/3)
-            area_code = generate_area_code(phone_number_type[i], mobile_code)
-
-            # Generating the exchange number - part(2/3)
-            is_mobile_number = area_code in mobile_code
-            # Calculating the Exchange number size based on the area code
-            exchange_number_size = 6-len(area_code)
-            exchange_number = generate_exchange_number(exchange_number_size, is_mobile_number)
-
-            # Generating the subscriber number - part(3/3)
-            subscriber_number = generate_subscriber_number()
+        # Generating N number of phone number images iteratively
+        for i in tqdm(range(num_images), disable=not show_progress):
+            start = time.perf_counter()
+            # Splitting the phone number into area code, exchange number and subscriber number
+            area_code, exchange_number, subscriber_number = split_phone_number(digits[i], part_sizes[i])
 
             # Generating an image by combining all 3-parts of the phone number
             _image  = combine_phone_number(area_code, exchange_number, subscriber_number, style_type[i], spacing_range, image_width)
+            render_end = time.perf_counter()
 
             # Adding random noise to the generated image
             _image = add_noise(_image)
-
-            # Saving the image with phone-number as filename
-            file_name = f"{''.join(map(str, area_code + exchange_number + subscriber_number))}.png"
-            plt.imsave(os.path.join(output_path, file_name), _image, cmap='gray')
-
-    except Exception as error:
-        logging.error("Error occurred in the main: %s", str(error))
-        raise ValueError("Number generation failed.") from error
+            noise_end = time.perf_counter()
+
+            if dataset is not None:
+                # Writing the image and its digits into the dataset
+                dataset.write(i, _image, digits[i][digits[i] >= 0])
+            else:
+                # Saving the image with phone-number as filename
+                file_name = f"{''.join(map(str, area_code + exchange_number + subscriber_number))}.png"
+                plt.imsave(os.path.join(output_path, file_name), _image, cmap='gray')
+
+            timings["render"] += render_end - start
+            timings["noise"] += noise_end - render_end
+            timings["write"] += time.perf_counter() - noise_end
+    except BaseException:
+        # The shared memory block is not tracked, it would outlive the process if not destroyed
+        if isinstance(dataset, SharedMemoryDataset):
+            dataset.unlink()
+        raise
+    finally:
+        if dataset is not None:
+            dataset.close()
+        if stage_times is not None:
+            for stage, seconds in timings.items():
+                stage_times[stage] = stage_times.get(stage, 0.0) + seconds
 
 @click.group()
 def main():
@@ -236,6 +245,9 @@ def main():
     - To generate random phone number images, use:
       $ python number-generator-script.py generate-phone-numbers --min-space 2 --max-space 4 --image-width 60 --num-images 5
 
+    - To measure the scaling of the phone number generation, use:
+      $ python number-generator-script.py load-test --workers 1 --workers 4 --num-images 1000 --baseline baseline.json
+
     For detailed information on each subcommand and their options, run:
       $ python number-generator-script.py.py [subcommand] --help
 
@@ -243,6 +255,7 @@ def main():
     ------------
     - generate-numbers-sequence: Generates an image from an input sequence of digits.
     - generate-phone-numbers: Generates random phone number images.
+    - load-test: Measures the throughput of the phone number generation and compares it with a baseline.
     """
     pass
 
@@ -283,7 +296,7 @@ def main_generate_numbers_sequence(sequence: int, min_space: int, max_space: int
         plt.imsave(os.path.join(output_path, filename), image, cmap='gray')
         logging.info("Saved image path: %s", os.path.join(output_path, filename))
 
-    except ValueError as err:
+    except (ValueError, OSError) as err:
         logging.error("Error occurred generating the number sequence: %s Provide valid arguments to the script."
                       " For more details, checkout the ReadMe usage guide.", str(err))
         raise ValueError("Number sequence generation failed.") from err
@@ -297,8 +310,19 @@ def main_generate_numbers_sequence(sequence: int, min_space: int, max_space: int
 @click.option('--max-space', type=int, required=True,  help="Max-space between the digits")
 @click.option('--image-width', type=int, required=True,  help="Width of the generated image")
 @click.option('--num-images', type=int, required=True,  help="Number of images to generate")
-@click.option('--output-path', required=True,  help="Path for generated image", default=".")
-def main_generate_phone_numbers(min_space: int, max_space: int, image_width: int, output_path: str, num_images: int):
+@click.option('--output-path', help="Path for generated image, or name of the shared memory block for shm "
+                                   "[default: current directory, or a generated block name for shm]")
+@click.option('--output-format', type=click.Choice(OUTPUT_FORMATS), default="png", show_default=True,
+              help="Save png files, memory-mapped .npy files or a shared memory block")
+@click.option('--type-weights', type=float, nargs=6, default=DEFAULT_TYPE_WEIGHTS, show_default=True,
+              help="Relative weights of the area codes with 2, 3, 4, 5, 6 digits and of the mobile numbers")
+@click.option('--real-area-codes', is_flag=True, help="Pick the area codes from a table of real Japanese area codes")
+@click.option('--balanced-digits', is_flag=True,
+              help="Generate every digit the same number of times, as far as the fixed leading 0 and "
+                   "mobile codes allow it")
+def main_generate_phone_numbers(min_space: int, max_space: int, image_width: int, output_path: str, num_images: int,
+                                output_format: str, type_weights: Tuple[float, ...], real_area_codes: bool,
+                                balanced_digits: bool):
     """
     This function is a CLI command that generates a specified number of random phone number images
     with the given spacing and image width. The images are saved in the specified output_path.
@@ -308,7 +332,13 @@ def main_generate_phone_numbers(min_space: int, max_space: int, image_width: int
         max_space : Maximum space (in pixels) between the digits in the generated images.
         image_width : Width of the generated images in pixels.
         output_path : Path where the generated images will be saved. Default is the current directory.
+                      For shm, name of the shared memory block, a unique name is generated and logged by default.
         num_images : Number of images to generate.
+        output_format : Format of the generated dataset: png, npy or shm.
+        type_weights : Relative weights of the 6 phone number types.
+        real_area_codes : If set, the area codes are picked from a table of real Japanese area codes.
+        balanced_digits : If set, every digit appears the same number of times in the dataset, as far as
+                          the fixed digits (leading 0, mobile codes) allow it.
     Returns:
         None, saves the generated images at the specified location.
     Notes:
@@ -318,17 +348,109 @@ def main_generate_phone_numbers(min_space: int, max_space: int, image_width: int
     try:
         if num_images > 0:
             # Calling the main function to generate phone numer
+            if output_path is None:
+                output_path = f"phone_numbers_{uuid.uuid4().hex[:8]}" if output_format == "shm" else "."
             logging.info("Generating %d random phone numbers", num_images)
-            generate_phone_number((min_space, max_space), image_width, output_path, num_images)
-
-            logging.info("Generated images saved at: %s", output_path)
+            generate_phone_number((min_space, max_space), image_width, output_path, num_images,
+                                  type_weights=type_weights, area_codes=JP_AREA_CODES if real_area_codes else None,
+                                  balanced_digits=balanced_digits, output_format=output_format)
+
+            if output_format == "shm":
+                logging.info("Generated images saved in the shared memory block: %s. Release it with "
+                             "SharedMemoryDataset.attach(%r).unlink() once it is not needed anymore.",
+                             output_path, output_path)
+            else:
+                logging.info("Generated images saved at: %s", output_path)
         else:
             raise ValueError("The num_images arguments should be greater 0.")
 
-    except ValueError as err:
+    except (ValueError, OSError) as err:
         logging.error("Error occurred generating the number sequence: %s Provide valid arguments to the script."
                       " For more details, checkout the ReadMe usage guide.", str(err))
         raise ValueError("Number sequence generation failed.") from err
 
+
+# ------------------------------------------------------------------------------------------#
+#   CLI - 3: An offline load test of CLI-2, sweeping the worker counts and dataset sizes    #
+# ------------------------------------------------------------------------------------------#
+@main.command("load-test", help="Measures the throughput of the phone number generation")
+@click.option('--workers', type=int, multiple=True, required=True, help="Number of worker processes, repeatable")
+@click.option('--num-images', type=int, multiple=True, required=True, help="Number of images to generate, repeatable")
+@click.option('--min-space', type=int, default=2, show_default=True, help="Min-space between the digits")
+@click.option('--max-space', type=int, default=4, show_default=True, help="Max-space between the digits")
+@click.option('--image-width', type=int, default=100, show_default=True, help="Width of the generated images")
+@click.option('--output-format', type=click.Choice(OUTPUT_FORMATS), default="npy", show_default=True,
+              help="Output format of the generated images")
+@click.option('--baseline', help="JSON file of the baseline throughputs")
+@click.option('--tolerance', type=float, default=0.2, show_default=True,
+              help="Maximum accepted throughput drop compared to the baseline (0.2 = 20%)")
+@click.option('--update-baseline', is_flag=True, help="Save the measures as the new baseline instead of comparing")
+@click.option('--report', help="JSON file where the measures of every configuration are saved")
+@click.option('--work-dir', help="Directory where the generated images are temporarily written "
+                                 "[default: the system temporary directory]")
+def main_load_test(workers: Tuple[int, ...], num_images: Tuple[int, ...], min_space: int, max_space: int,
+                   image_width: int, output_format: str, baseline: Optional[str], tolerance: float,
+                   update_baseline: bool, report: Optional[str], work_dir: Optional[str]):
+    """
+    Runs the phone number generation for every combination of worker count and dataset size,
+    and records the throughput (images/sec), peak memory and time spent in each stage.
+
+    Args
+        workers : Numbers of worker processes.
+        num_images : Numbers of images to generate.
+        min_space : Minimum space (in pixels) between the digits in the generated images.
+        max_space : Maximum space (in pixels) between the digits in the generated images.
+        image_width : Width of the generated images in pixels.
+        output_format : Output format of the generated images: png, npy or shm.
+        baseline : JSON file of the baseline throughputs.
+        tolerance : Maximum accepted throughput drop compared to the baseline.
+        update_baseline : If set, the measures are saved as the new baseline.
+        report : JSON file where the measures of every configuration are saved.
+        work_dir : Directory where the generated images are temporarily written, for the large datasets
+                   which don't fit in the system temporary directory.
+    Returns:
+        None, fails if the throughput of a configuration dropped beyond the tolerance.
+    """
+    # Imported here, as the load test relies on the POSIX-only resource module
+    from load_test import compare_to_baseline, load_baseline, run_load_test, save_baseline
+
+    try:
+        validate_spacing_range((min_space, max_space))
+        validate_image_width(image_width)
+        if min(workers) <= 0 or min(num_images) <= 0:
+            raise ValueError("The workers and num_images arguments should be greater 0.")
+        if not 0 <= tolerance < 1:
+            raise ValueError(f"The tolerance should be between 0 and 1 (excluded), got: {tolerance}")
+        if update_baseline and not baseline:
+            raise ValueError("The --update-baseline option requires the --baseline option.")
+
+        generate_fn = functools.partial(generate_phone_number, (min_space, max_space), image_width,
+                                        output_format=output_format, show_progress=False)
+        results = run_load_test(generate_fn, workers, num_images, output_format=output_format,
+                                warmup_fn=DEFAULT_GENERATOR.load, reseed_fn=_reseed_worker,
+                                settings={"image_width": image_width, "spacing_range": [min_space, max_space]},
+                                work_dir=work_dir)
+
+        if report:
+            with open(report, "w", encoding="utf-8") as file:
+                json.dump(results, file, indent=2)
+            logging.info("Load test report saved at: %s", report)
+
+        if baseline and update_baseline:
+            save_baseline(baseline, results)
+            logging.info("Baseline saved at: %s", baseline)
+        elif baseline:
+            regressions = compare_to_baseline(results, load_baseline(baseline), tolerance)
+            for regression in regressions:
+                logging.error("Throughput regression: %s", regression)
+            if regressions:
+                raise ValueError(f"The throughput of {len(regressions)} configuration(s) dropped beyond the tolerance.")
+            logging.info("No throughput regression compared to the baseline.")
+
+    except (ValueError, OSError) as err:
+        logging.error("Error occurred during the load test: %s Provide valid arguments to the script."
+                      " For more details, checkout the ReadMe usage guide.", str(err))
+        raise ValueError("Load test failed.") from err
+
 if __name__ == "__main__":
     main()
@@ -2,19 +2,50 @@
 Generate Number Sequence
 """
 import logging
+import threading
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple, Union
 from collections.abc import Iterable
 
 import cv2
 import numpy as np
 from mnist import MNIST
 
+from glyph_metrics import compute_glyph_metrics
+from render_cache import RenderCache
+
 DATA_PATH = Path(__file__).parent / "../resources"
-IMAGES = None
-LABELS = None
 
 
+class SequenceArgumentError(ValueError):
+    """
+    Base class of the errors raised for invalid arguments of the number sequence generation.
+    """
+
+
+class InvalidDigitsError(SequenceArgumentError):
+    """
+    Raised when the digits are empty, not integers or not between 0 and 9.
+    """
+
+
+class InvalidSpacingError(SequenceArgumentError):
+    """
+    Raised when the spacing range is not a (minimum, maximum) pair with 0 <= minimum < maximum.
+    """
+
+
+class InvalidWidthError(SequenceArgumentError):
+    """
+    Raised when the image width is not a positive integer.
+    """
+
+
+class InvalidSeedError(SequenceArgumentError):
+    """
+    Raised when the seed is not a non-negative integer.
+    """
+
 
 def _load_data(data_path: str) -> Tuple[list, list]:
     """
@@ -23,18 +54,21 @@ def _load_data(data_path: str) -> Tuple[list, list]:
     Args:
         data_path: Path where the mnist.zip file is extracted.
     Returns:
-        tuple: A tuple containing two lists - the training images and labels.
+        tuple: A tuple containing the training images as a (N, 28, 28) uint8 array,
+               and a list with the indices of the images of each class.
 
     Notes:
         The MNIST data can be downloaded from: https://data.deepai.org/mnist.zip.
         Make sure to extract the mnist.zip file and provide the path to the extracted directory.
-        This function is later used to initialize the global variable Images and Labels.
+        This function is later used to initialize the glyph bank of a SequenceGenerator.
     """
 
     try:
         # Loading the data
         images, labels = MNIST(data_path).load_training()
 
+        # Converting the images to a compact uint8 array, 784 bytes per image
+        images = np.array(images, dtype="uint8").reshape(-1, 28, 28)
         # Converting the labels to array
         labels = np.array(labels, dtype="int16")
 
@@ -51,49 +85,315 @@ def _load_data(data_path: str) -> Tuple[list, list]:
         raise ValueError("Failed to load the MNIST data.") from err
 
 
-def _get_image(images: list, idx: int) -> np.array:
+def validate_digits(digits: Iterable[int]) -> np.ndarray:
+    """
+    Checks the digits of a sequence at once.
+
+    Args:
+        digits: An iterable containing the numerical values of the digits.
+    Returns:
+        np.ndarray: The digits as a 1-D int64 array.
+    Raises:
+        InvalidDigitsError: If the digits are empty, not integers or not between 0 and 9.
+    """
+    try:
+        _digits = np.asarray(digits if isinstance(digits, (np.ndarray, list, tuple)) else list(digits))
+    except (TypeError, ValueError) as err:
+        # Not iterable, or a ragged nested sequence
+        raise InvalidDigitsError(f"The digits should be a non-empty sequence of integers, got: {digits!r}") from err
+    if _digits.ndim != 1 or _digits.size == 0 or not np.issubdtype(_digits.dtype, np.integer):
+        raise InvalidDigitsError(f"The digits should be a non-empty sequence of integers, got: {digits!r}")
+    if np.any((_digits < 0) | (_digits > 9)):
+        raise InvalidDigitsError(f"The digits should be single digit numbers between 0 and 9, got: {digits!r}")
+    return _digits.astype("int64", copy=False)
+
+
+def validate_spacing_range(spacing_range: Tuple[int, int]) -> Tuple[int, int]:
     """
-    Fetches an image from the global Images list, removes the
-    horizontal paddings from front and back, and inverts the
-    pixel values (like: 255.0 -> 0.0 and 0.0 -> 255.0).
+    Checks a spacing range.
 
     Args:
-        images: List containing all the images from MNIST data.
-        idx: Index of the image to be fetched.
+        spacing_range: A (minimum, maximum) int pair (tuple), representing the min and max spacing
+                       between digits. Unit is pixel.
     Returns:
-        np.array: Array of the image, without any horizontal paddings.
+        tuple: The spacing range as a pair of python ints.
+    Raises:
+        InvalidSpacingError: If it is not a (minimum, maximum) int pair with 0 <= minimum < maximum.
     """
     try:
-        # Converting the image to array
-        image = np.array(images[idx]).reshape(28, 28)
-        # Creating a boolean array copy
-        _image = image.astype(bool)
-
-        # All the x-coordinates where the pixel value is True
-        _x_cords = np.where(_image == True)[1]
-
-        # Clipping the horizontal paddings
-        #       ^ y axis
-        #       |
-        #       |    @@@@@@@
-        #       |    @@
-        #       |    @@@@@@@
-        #       |          @@
-        #       |    @@@@@@@
-        #       ----|--------|----> x axis
-        #        (x-min)  (x-max)
-        image = image[:, np.min(_x_cords):np.max(_x_cords)]
-
-        # Inverting the pixel values as we want the letters in black and background as white.
-        image = 255.0 - image
+        low, high = spacing_range
+    except (TypeError, ValueError) as err:
+        raise InvalidSpacingError(f"The spacing range should be a (minimum, maximum) pair, "
+                                  f"got: {spacing_range!r}") from err
+    if not all(isinstance(value, (int, np.integer)) and not isinstance(value, bool) for value in (low, high)) \
+            or not 0 <= low < high:
+        raise InvalidSpacingError(f"The spacing range should contain two integers with 0 <= minimum < maximum, "
+                                  f"got: {spacing_range!r}")
+    return int(low), int(high)
+
+
+def validate_image_width(image_width: int) -> int:
+    """
+    Checks an image width.
+
+    Args:
+        image_width: Specifies the width of the image in pixels.
+    Returns:
+        int: The image width as a python int.
+    Raises:
+        InvalidWidthError: If the image width is not a positive integer.
+    """
+    if not isinstance(image_width, (int, np.integer)) or isinstance(image_width, bool) or image_width <= 0:
+        raise InvalidWidthError(f"The image width should be a positive integer, got: {image_width!r}")
+    return int(image_width)
+
+
+def validate_seed(seed: Optional[int]) -> Optional[int]:
+    """
+    Checks a seed.
+
+    Args:
+        seed: Optional seed of the random number generator.
+    Returns:
+        int: The seed as a python int, so that np.int64(3) and 3 share the same cache entry, or None.
+    Raises:
+        InvalidSeedError: If the seed is not None or a non-negative integer.
+    """
+    if seed is None:
+        return None
+    if not isinstance(seed, (int, np.integer)) or isinstance(seed, bool) or seed < 0:
+        raise InvalidSeedError(f"The seed should be a non-negative integer, got: {seed!r}")
+    return int(seed)
+
+
+class SequenceGenerator:
+    """
+    Generates images of number sequences from its own bank of MNIST glyphs.
+
+    Each instance owns its glyph bank, random number generator and caches, so several
+    datasets or configurations can be used in the same process. An instance can be shared
+    across a thread pool: the glyph bank is loaded once under a lock and is read-only
+    afterwards, the random number generator serializes its calls with its own lock, and
+    the NumPy/OpenCV calls used for rendering release the GIL.
+    """
+    __slots__ = ("_data_path", "_glyphs", "_class_indices", "_class_sizes", "_metrics", "_rng", "_lock", "_cache")
+
+    def __init__(self, data_path: str = DATA_PATH, seed: Optional[int] = None,
+                 glyphs: Optional[np.ndarray] = None, class_indices: Optional[list] = None,
+                 cache: Optional[RenderCache] = None):
+        """
+        Args:
+            data_path: Path where the mnist.zip file is extracted. The data is loaded during
+                       the first call of `generate`.
+            seed: Seed of the random number generator, for reproducible images.
+            glyphs: Optional (N, 28, 28) array of already loaded images, used instead of `data_path`.
+            class_indices: Indices of the images of each class, required with `glyphs`.
+            cache: Optional cache of the images generated with a seed, see `generate`.
+        Raises:
+            ValueError: If `glyphs` is given without `class_indices`.
+        """
+        self._data_path = data_path
+        self._glyphs = None
+        self._class_indices = None
+        self._class_sizes = None
+        # Metrics of each glyph, computed once with the glyph bank (see glyph_metrics)
+        self._metrics = None
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._cache = cache
+        if glyphs is not None:
+            if class_indices is None:
+                raise ValueError("The class_indices argument is required with the glyphs argument.")
+            self._set_glyph_bank(np.asarray(glyphs, dtype="uint8").reshape(-1, 28, 28), class_indices)
+
+    def _set_glyph_bank(self, glyphs: np.ndarray, class_indices: list) -> None:
+        """
+        Sets the glyph bank and computes the metrics of all its glyphs.
+
+        Args:
+            glyphs: (N, 28, 28) uint8 array of images.
+            class_indices: Indices of the images of each class.
+        """
+        self._metrics = compute_glyph_metrics(glyphs)
+        self._class_indices = class_indices
+        self._class_sizes = np.array([len(indices) for indices in class_indices])
+        # Set last, as it is used to check whether the glyph bank is loaded
+        self._glyphs = glyphs
+
+    def load(self) -> None:
+        """
+        Loads the glyph bank, if not already loaded. Safe to call from several threads.
+        """
+        if self._glyphs is None:
+            with self._lock:
+                if self._glyphs is None:
+                    self._set_glyph_bank(*_load_data(self._data_path))
+
+    def reseed(self, seed: Optional[Union[int, np.random.SeedSequence]]) -> None:
+        """
+        Resets the random number generator, for example in a forked worker process which
+        would otherwise generate the same images as its parent and siblings.
+
+        Args:
+            seed: The new seed.
+        """
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def cache(self) -> Optional[RenderCache]:
+        """
+        Cache of the images generated with a seed, None if the images are not cached.
+        """
+        return self._cache
+
+    @cache.setter
+    def cache(self, cache: Optional[RenderCache]) -> None:
+        self._cache = cache
+
+    @property
+    def metrics(self) -> np.ndarray:
+        """
+        Metrics of all the glyphs of the glyph bank, see `glyph_metrics.compute_glyph_metrics`.
+        """
+        self.load()
+        return self._metrics
+
+    def render(self, digits: np.ndarray, spacing_range: Tuple[int, int], image_width: Optional[int],
+               rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Unchecked fast path of `generate`, for arguments already validated by the caller
+        with `validate_digits`, `validate_spacing_range` and `validate_image_width`.
+
+        Args:
+            digits: 1-D integer array of digits between 0 and 9.
+            spacing_range: A (minimum, maximum) int pair, with 0 <= minimum < maximum.
+            image_width: Positive width of the image in pixels, or None to keep the natural width
+                         of the composition (no resize).
+            rng: Random number generator to be used instead of the generator's one.
+        Returns:
+            np.ndarray: The image containing the sequence of numbers, like `generate`.
+        """
+        # Loading the glyph bank, if not already loaded
+        self.load()
+        rng = self._rng if rng is None else rng
+
+        # Selecting a random image of each digit's class, and a random white-space between consecutive digits
+        picks = rng.integers(0, self._class_sizes[digits])
+        spaces = rng.integers(low=spacing_range[0], high=spacing_range[1], size=len(digits))
+        spaces[-1] = 0
+        glyph_ids = np.array([self._class_indices[digit][pick] for digit, pick in zip(digits, picks)])
+
+        # Horizontal bounds of the glyphs, used to remove their paddings. The crop keeps all the
+        # ink columns [x_min, x_max], so the rendered width is the stored `width` metric.
+        x_min = self._metrics["x_min"][glyph_ids].astype("int64")
+        widths = self._metrics["width"][glyph_ids].astype("int64")
+        # Position of each glyph in the combined image
+        x_start = np.concatenate(([0], np.cumsum(widths + spaces)[:-1]))
+
+        # Pasting the glyphs on a white canvas, with the pixel values inverted
+        # as we want the letters in black and background as white.
+        combined_img = np.full((28, int(widths.sum() + spaces.sum())), 255.0, dtype="float32")
+        for idx, x, x_0, width in zip(glyph_ids, x_start, x_min, widths):
+            combined_img[:, x:x + width] = 255 - self._glyphs[idx, :, x_0:x_0 + width]
+
+        # Adjusting to the user specified image-width
+        if image_width is not None:
+            combined_img = cv2.resize(combined_img, (image_width, 28))
+        # Normalizing the pixel values between 0 (black) and 1 (white)
+        normalized_image = np.round(combined_img/255.0, decimals=2)
+        return normalized_image
+
+    def _render_seeded(self, digits: np.ndarray, spacing_range: Tuple[int, int], image_width: Optional[int],
+                       seed: Optional[int]) -> np.ndarray:
+        """
+        Renders validated arguments, with the cache for the calls with a seed.
+
+        Args:
+            digits: 1-D integer array of digits between 0 and 9.
+            spacing_range: A (minimum, maximum) int pair, with 0 <= minimum < maximum.
+            image_width: Positive width of the image in pixels, or None to keep the natural width.
+            seed: Optional seed, the random path is taken if None.
+        Returns:
+            np.ndarray: The image containing the sequence of numbers.
+        """
+        if seed is None:
+            return self.render(digits, spacing_range, image_width)
+
+        key = (tuple(digits.tolist()), spacing_range, image_width, seed)
+        if self._cache is not None:
+            image = self._cache.get(key)
+            if image is not None:
+                return image
+        image = self.render(digits, spacing_range, image_width, rng=np.random.default_rng(seed))
+        if self._cache is not None:
+            self._cache.put(key, image)
         return image
 
-    except Exception as err:
-        logging.error('An error was occurred while processing image: %s', str(err))
-        raise ValueError('Invalid input error or image processing error.') from err
+    def generate(self, digits: Iterable[int], spacing_range: Tuple[int, int], image_width: int,
+                 seed: Optional[int] = None) -> np.ndarray:
+        """
+        Generate an image that contains the sequence of given numbers, spaced randomly using a uniform distribution.
+
+        Args:
+            digits: An iterable containing the numerical values of the digits from which
+                    the sequence will be generated (for example [3, 5, 0]).
+                    Each value should be between 0 and 9. Otherwise, it raises an Exception.
+            spacing_range: A (minimum, maximum) int pair (tuple), representing the min and max spacing
+                           between digits. Unit is pixel.
+            image_width: Specifies the width of the image in pixels.
+            seed: Optional seed, to generate the same image for the same arguments. The images
+                  generated with a seed are looked up in and added to the generator's cache.
+
+        Returns:
+            np.ndarray: The image containing the sequence of numbers. Image represented as floating
+                        point 32bits numpy arrays with a scale ranging from 0 (black) to 1 (white),
+                        the first dimension corresponding to the height and the second dimension to the width.
+        Raises:
+            InvalidDigitsError, InvalidSpacingError, InvalidWidthError, InvalidSeedError: For invalid arguments,
+                all of them are subclasses of ValueError.
+        """
+        return self._render_seeded(validate_digits(digits), validate_spacing_range(spacing_range),
+                                   validate_image_width(image_width), validate_seed(seed))
+
+    def generate_natural(self, digits: Iterable[int], spacing_range: Tuple[int, int],
+                         seed: Optional[int] = None) -> np.ndarray:
+        """
+        Generate an image of the sequence of given numbers at its natural width, without the final resize.
+        The glyphs keep their aspect ratio, and the width depends on the glyphs and spaces picked.
+        Use `batching.collate_batch` to pack such images into a padded batch.
+
+        Args:
+            digits: An iterable containing the numerical values of the digits (for example [3, 5, 0]).
+            spacing_range: A (minimum, maximum) int pair (tuple), representing the min and max spacing
+                           between digits. Unit is pixel.
+            seed: Optional seed, to generate the same image for the same arguments, see `generate`.
+
+        Returns:
+            np.ndarray: A (28, W) float32 image with a scale ranging from 0 (black) to 1 (white).
+        Raises:
+            InvalidDigitsError, InvalidSpacingError, InvalidSeedError: For invalid arguments.
+        """
+        return self._render_seeded(validate_digits(digits), validate_spacing_range(spacing_range), None,
+                                   validate_seed(seed))
+
 
+# Default instance used by generate_numbers_sequence, loading the data from DATA_PATH
+DEFAULT_GENERATOR = SequenceGenerator()
 
-def generate_numbers_sequence(digits: Iterable[int], spacing_range: Tuple[int, int], image_width: int) -> np.ndarray:
+
+def set_render_cache(cache: Optional[RenderCache]) -> None:
+    """
+    Sets the cache of the default SequenceGenerator, used by `generate_numbers_sequence` and
+    `generate_natural_width_sequence` for the calls with a seed.
+
+    Args:
+        cache: The cache, or None to stop caching the images.
+    """
+    DEFAULT_GENERATOR.cache = cache
+
+
+def generate_numbers_sequence(digits: Iterable[int], spacing_range: Tuple[int, int], image_width: int,
+                              seed: Optional[int] = None) -> np.ndarray:
     """
     Generate an image that contains the sequence of given numbers, spaced randomly using a uniform distribution.
 
@@ -104,42 +404,41 @@ def generate_numbers_sequence(digits: Iterable[int], spacing_range: Tuple[int, i
         spacing_range: A (minimum, maximum) int pair (tuple), representing the min and max spacing
                        between digits. Unit is pixel.
         image_width: Specifies the width of the image in pixels.
+        seed: Optional seed, to generate the same image for the same arguments. The images generated
+              with a seed are cached if a cache is set with `set_render_cache`.
 
     Returns:
         np.ndarray: The image containing the sequence of numbers. Image represented as floating
                     point 32bits numpy arrays with a scale ranging from 0 (black) to 1 (white),
                     the first dimension corresponding to the height and the second dimension to the width.
+
+    Raises:
+        InvalidDigitsError, InvalidSpacingError, InvalidWidthError, InvalidSeedError: For invalid arguments,
+            all of them are subclasses of ValueError.
+
+    Notes:
+        This function uses a default SequenceGenerator, shared by the whole process.
     """
-    try:
-        # Fetching the global variables and initializing them, if not already initialized.
-        global IMAGES, LABELS
-        if IMAGES is None or LABELS is None:
-            IMAGES, LABELS = _load_data(DATA_PATH)
-
-        # Iterating on all the digits
-        combined_img = []
-        for i in digits:
-            # Check if the digit is between 0 and 9
-            if 0 <= i <= 9:
-                # Selecting a random image of a particular class
-                image = _get_image(IMAGES, np.random.choice(LABELS[i]))
-                # Creating a random white-space between the specified range
-                white_space = np.ones((28, np.random.randint(low=spacing_range[0], high=spacing_range[1])))*255.0
-                # Combining image and white-space with the rest of images
-                combined_img += [image, white_space]
-            else:
-                raise ValueError('The numbers inside the sequence should be single digit numbers between 0 and 1.')
-
-        # Concatenating all digits and white-spaces to a single image
-        combined_img = np.concatenate(combined_img[:-1], axis=1, dtype="float32")
-        # Adjusting to the user specified image-width
-        resized_image = cv2.resize(combined_img, (image_width, 28))
-        # Normalizing the pixel values between 0 (black) and 1 (white)
-        normalized_image = np.round(resized_image/255.0, decimals=2)
-        return normalized_image
+    return DEFAULT_GENERATOR.generate(digits, spacing_range, image_width, seed=seed)
 
-    except Exception as err:
-        logging.error("An error occurred while generating the number sequence: %s "
-                      "Make sure digits argument is not empty and correct sequence of digits "
-                      "are passed to the function.", str(err))
-        raise ValueError('Number sequence generation failed.') from err
+
+def generate_natural_width_sequence(digits: Iterable[int], spacing_range: Tuple[int, int],
+                                    seed: Optional[int] = None) -> np.ndarray:
+    """
+    Generate an image of the sequence of given numbers at its natural width, without the final resize.
+
+    Args:
+        digits: An iterable containing the numerical values of the digits (for example [3, 5, 0]).
+        spacing_range: A (minimum, maximum) int pair (tuple), representing the min and max spacing
+                       between digits. Unit is pixel.
+        seed: Optional seed, to generate the same image for the same arguments.
+
+    Returns:
+        np.ndarray: A (28, W) float32 image with a scale ranging from 0 (black) to 1 (white).
+    Raises:
+        InvalidDigitsError, InvalidSpacingError, InvalidSeedError: For invalid arguments.
+
+    Notes:
+        This function uses the default SequenceGenerator, like `generate_numbers_sequence`.
+    """
+    return DEFAULT_GENERATOR.generate_natural(digits, spacing_range, seed=seed)
@@ -0,0 +1,205 @@
+"""
+Vectorized Japanese Phone Number Plan Sampler
+"""
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Maximum number of digits in a phone number (mobile numbers: 3 + 4 + 4)
+MAX_DIGITS = 11
+# Value used to pad the unused positions of the digit matrix
+PAD_DIGIT = -1
+# Size of the subscriber number (Part 3), which is the same for every phone number type
+SUBSCRIBER_SIZE = 4
+
+# Phone number types, in the order used by the `type_weights` argument:
+#   index 0-4 -> landline numbers with an area code of 2-6 digits (Type 1 - Type 5)
+#   index 5   -> mobile numbers (070, 080 or 090)
+AREA_CODE_SIZES = (2, 3, 4, 5, 6)
+MOBILE_TYPE = len(AREA_CODE_SIZES)
+# Default weights reproduce the original distribution: each landline type with 1/9
+# probability and mobile numbers with 4/9 probability.
+DEFAULT_TYPE_WEIGHTS = (1, 1, 1, 1, 1, 4)
+
+MOBILE_CODES = ("070", "080", "090")
+
+# A selection of real Japanese area codes, grouped by their number of digits.
+# Reference: https://en.wikipedia.org/wiki/List_of_dialing_codes_in_Japan
+JP_AREA_CODES: Dict[int, Tuple[str, ...]] = {
+    2: ("03", "06"),
+    3: ("011", "022", "025", "027", "043", "045", "048", "052", "054", "075",
+        "076", "078", "082", "086", "087", "092", "096", "098"),
+    4: ("0422", "0463", "0466", "0532", "0776", "0852", "0857", "0952"),
+    5: ("04992", "04994", "04996"),
+}
+
+
+def _code_matrix(codes: Sequence[str]) -> np.ndarray:
+    """
+    Converts a list of equally sized digit strings to a (K, size) int8 matrix.
+
+    Args:
+        codes: Digit strings, like ("070", "080").
+    Returns:
+        np.ndarray: Matrix of the digits, one code per row.
+    """
+    return np.array([[int(d) for d in code] for code in codes], dtype="int8").reshape(len(codes), -1)
+
+
+def _water_fill(fixed_counts: np.ndarray, total: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Splits `total` new digits between the classes, so that the final counts (fixed + new)
+    are as equal as possible. The classes which already have more digits than the others
+    don't get any new digit.
+
+    Args:
+        fixed_counts: Number of digits of each class which are already set.
+        total: Number of new digits.
+        rng: Random number generator, used to break the ties.
+    Returns:
+        np.ndarray: Number of new digits of each class.
+    """
+    fixed_counts = np.asarray(fixed_counts, dtype="int64")
+    # Highest level which can be reached by every class below it
+    low, high = 0, int(fixed_counts.max(initial=0)) + total
+    while low < high:
+        level = (low + high + 1) // 2
+        if np.maximum(level - fixed_counts, 0).sum() <= total:
+            low = level
+        else:
+            high = level - 1
+    added = np.maximum(low - fixed_counts, 0)
+    # The remaining digits (less than the number of classes at the level) go to random classes at the level
+    remainder = total - int(added.sum())
+    added[rng.choice(np.flatnonzero(fixed_counts <= low), size=remainder, replace=False)] += 1
+    return added
+
+
+def _fill_balanced_digits(digits: np.ndarray, nonzero_slots: np.ndarray, free_slots: np.ndarray,
+                          rng: np.random.Generator) -> None:
+    """
+    Fills the random positions of the phone numbers, so that every digit appears the same number
+    of times in the whole dataset, including the fixed digits (leading 0, mobile and area codes).
+
+    Args:
+        digits: (N, 11) digit matrix, with the fixed digits already set. Modified in-place.
+        nonzero_slots: Mask of the random positions which can't contain a 0 (area code digits).
+        free_slots: Mask of the random positions which can contain any digit.
+        rng: Random number generator.
+
+    Notes:
+        The digits which are over-represented by the fixed digits (typically 0, which starts every
+        phone number) are not generated in the random positions, and the other digits are balanced
+        (up to one).
+    """
+    fixed_counts = np.bincount(digits[(digits >= 0) & ~nonzero_slots & ~free_slots], minlength=10)
+    num_nonzero, num_free = int(nonzero_slots.sum()), int(free_slots.sum())
+    added = _water_fill(fixed_counts, num_nonzero + num_free, rng)
+    if added[0] > num_free:
+        # Not enough positions for the zeros, the area code positions get the other digits
+        added[0] = num_free
+        added[1:] = _water_fill(fixed_counts[1:], num_nonzero, rng)
+
+    nonzero_digits = rng.permutation(np.repeat(np.arange(1, 10, dtype="int8"), added[1:]))
+    digits[nonzero_slots] = nonzero_digits[:num_nonzero]
+    digits[free_slots] = rng.permutation(np.concatenate([nonzero_digits[num_nonzero:],
+                                                         np.zeros(added[0], dtype="int8")]))
+
+
+def sample_phone_numbers(num_images: int, type_weights: Sequence[float] = DEFAULT_TYPE_WEIGHTS,
+                         area_codes: Optional[Dict[int, Sequence[str]]] = None,
+                         balanced_digits: bool = False,
+                         rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generates the digits of N random Japanese phone numbers at once.
+
+    Args:
+        num_images: Number of phone numbers to be generated.
+        type_weights: Relative weights of the 6 phone number types (area code of 2, 3, 4, 5
+                      or 6 digits, and mobile number). Weights don't need to sum up to 1.
+        area_codes: Optional table of area codes grouped by size (like `JP_AREA_CODES`).
+                    If given, the landline area codes are picked from the table and the
+                    types without any area code in the table are never generated.
+                    Otherwise, area codes are a 0 followed by random digits between 1 and 9.
+        balanced_digits: If True, every digit (0-9) appears the same number of times (up to one)
+                         in the generated dataset, counting the fixed digits of the area and mobile
+                         codes, instead of being sampled independently. The digits which are already
+                         over-represented by the fixed digits (typically 0) are not generated anymore.
+        rng: Random number generator, a new unseeded one is created if not given.
+    Returns:
+        tuple: A tuple containing two arrays:
+               - digits: (N, 11) int8 array with the digits of each phone number,
+                         padded with -1 at the end.
+               - part_sizes: (N, 3) int8 array with the size of the area code, exchange number
+                             and subscriber number of each phone number.
+
+    Notes:
+        The rows can be split back into the 3 parts with `split_phone_number`.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+
+    weights = np.array(type_weights, dtype="float64")
+    if weights.shape != (len(AREA_CODE_SIZES) + 1,) or np.any(weights < 0):
+        raise ValueError(f"type_weights should contain {len(AREA_CODE_SIZES) + 1} non-negative weights.")
+    if area_codes is not None:
+        # Dropping the types which don't have any area code in the table
+        for i, size in enumerate(AREA_CODE_SIZES):
+            if not area_codes.get(size):
+                weights[i] = 0.0
+    if weights.sum() <= 0:
+        raise ValueError("At least one of the phone number types should have a positive weight.")
+
+    # Randomly selecting the type of each phone number
+    types = rng.choice(len(weights), size=num_images, p=weights / weights.sum())
+    is_mobile = types == MOBILE_TYPE
+
+    # Size of each part of the phone numbers
+    area_size = np.where(is_mobile, 3, np.array(AREA_CODE_SIZES + (0,))[types]).astype("int8")
+    exchange_size = np.where(is_mobile, 4, 6 - area_size).astype("int8")
+    total_size = area_size + exchange_size + SUBSCRIBER_SIZE
+    columns = np.arange(MAX_DIGITS)
+
+    # Generating the area codes - part(1/3)
+    area = np.zeros((num_images, MAX_DIGITS), dtype="int8")
+    random_area = np.zeros((num_images, MAX_DIGITS), dtype="bool")
+    if area_codes is None:
+        # 0 followed by random digits between 1 and 9
+        random_area = (columns >= 1) & (columns[None, :] < area_size[:, None]) & ~is_mobile[:, None]
+        if not balanced_digits:
+            area[random_area] = rng.integers(1, 10, size=int(random_area.sum()), dtype="int8")
+    else:
+        for i, size in enumerate(AREA_CODE_SIZES):
+            rows = np.flatnonzero(types == i)
+            if rows.size:
+                table = _code_matrix(area_codes[size])
+                area[rows, :size] = table[rng.integers(0, len(table), size=rows.size)]
+    mobile_rows = np.flatnonzero(is_mobile)
+    mobile_table = _code_matrix(MOBILE_CODES)
+    area[mobile_rows, :3] = mobile_table[rng.integers(0, len(mobile_table), size=mobile_rows.size)]
+
+    # Generating the exchange and subscriber numbers - part(2/3) and part(3/3)
+    free = (columns[None, :] >= area_size[:, None]) & (columns[None, :] < total_size[:, None])
+    digits = np.where(columns[None, :] < area_size[:, None], area, PAD_DIGIT).astype("int8")
+    if balanced_digits:
+        # The random digits of the area codes are balanced together with the other parts
+        _fill_balanced_digits(digits, random_area, free, rng)
+    else:
+        digits[free] = rng.integers(0, 10, size=int(free.sum()), dtype="int8")
+
+    part_sizes = np.stack([area_size, exchange_size, np.full_like(area_size, SUBSCRIBER_SIZE)], axis=1)
+    return digits, part_sizes
+
+
+def split_phone_number(digits: np.ndarray, part_sizes: np.ndarray) -> Tuple[list, list, list]:
+    """
+    Splits a row returned by `sample_phone_numbers` into the 3 parts of the phone number.
+
+    Args:
+        digits: Row of the digit matrix.
+        part_sizes: Row of the part sizes matrix.
+    Returns:
+        tuple: The area code, exchange number and subscriber number as lists of digits.
+    """
+    area_size, exchange_size, subscriber_size = (int(size) for size in part_sizes)
+    number = digits[:area_size + exchange_size + subscriber_size].tolist()
+    return number[:area_size], number[area_size:area_size + exchange_size], number[area_size + exchange_size:]
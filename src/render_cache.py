@@ -0,0 +1,172 @@
+"""
+Rendering Cache for Repeated Number Sequences
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import numpy as np
+
+
+class RenderCache:
+    """
+    A size-bounded LRU cache of rendered images, with an optional on-disk tier.
+
+    Only the deterministic renderings (the calls with a seed) should be cached, keyed
+    by (digits, spacing_range, image_width, seed). The in-memory tier evicts the least
+    recently used images once `max_entries` or `max_bytes` is exceeded. If `cache_dir`
+    is given, the images are also saved there as .npy files and looked up on a miss of
+    the in-memory tier, and the least recently used files are removed once they exceed
+    `max_disk_bytes`. A cache directory should only be shared by generators using the
+    same glyph bank.
+    """
+    __slots__ = ("_max_entries", "_max_bytes", "_cache_dir", "_max_disk_bytes", "_disk_bytes", "_entries",
+                 "_num_bytes", "_lock")
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Maximum number of images kept in memory.
+            max_bytes: Maximum total size of the images kept in memory, in bytes.
+            cache_dir: Optional directory of the on-disk tier, created if it doesn't exist.
+            max_disk_bytes: Maximum total size of the files of the on-disk tier, in bytes.
+        """
+        if max_entries <= 0 or max_bytes <= 0 or max_disk_bytes <= 0:
+            raise ValueError("The maximum number of entries and bytes of the cache should be greater than 0.")
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._cache_dir = cache_dir
+        self._max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._num_bytes = 0
+        self._lock = threading.Lock()
+        # Estimated size of the on-disk tier, recomputed from the directory when it exceeds the limit
+        self._disk_bytes = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._evict_from_disk()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _path(self, key: Hashable) -> str:
+        """
+        Returns the path of the on-disk file of a key.
+
+        Args:
+            key: Key of the image.
+        Returns:
+            str: Path of the .npy file.
+        """
+        return os.path.join(self._cache_dir, hashlib.sha1(repr(key).encode()).hexdigest() + ".npy")
+
+    def _evict_from_disk(self) -> None:
+        """
+        Removes the least recently used files of the on-disk tier until it fits in `max_disk_bytes`.
+        The files are ordered by modification time, which is updated when a file is read.
+        """
+        files = []
+        for entry in os.scandir(self._cache_dir):
+            if entry.name.endswith(".npy"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # Removed by another process sharing the directory
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+
+        num_bytes = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if num_bytes <= self._max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            num_bytes -= size
+        self._disk_bytes = num_bytes
+
+    def _put_in_memory(self, key: Hashable, image: np.ndarray) -> None:
+        """
+        Adds an image to the in-memory tier and evicts the least recently used images if needed.
+
+        Args:
+            key: Key of the image.
+            image: Read-only image.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._num_bytes -= self._entries.pop(key).nbytes
+            self._entries[key] = image
+            self._num_bytes += image.nbytes
+            while len(self._entries) > self._max_entries or \
+                    (self._num_bytes > self._max_bytes and len(self._entries) > 1):
+                self._num_bytes -= self._entries.popitem(last=False)[1].nbytes
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """
+        Looks up an image, first in memory then on the disk.
+
+        Args:
+            key: Key of the image.
+        Returns:
+            np.ndarray: A copy of the cached image, or None if it is not cached.
+        """
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                return image.copy()
+
+        if self._cache_dir is not None:
+            path = self._path(key)
+            try:
+                image = np.load(path)
+            except (OSError, ValueError):
+                return None
+            try:
+                # Marking the file as recently used, for the eviction of the on-disk tier
+                os.utime(path)
+            except OSError:
+                # Already evicted by another process sharing the directory
+                pass
+            image.setflags(write=False)
+            self._put_in_memory(key, image)
+            return image.copy()
+        return None
+
+    def put(self, key: Hashable, image: np.ndarray) -> None:
+        """
+        Adds an image to the cache.
+
+        Args:
+            key: Key of the image.
+            image: The rendered image, it is copied so the caller can still modify it.
+        """
+        image = image.copy()
+        image.setflags(write=False)
+        self._put_in_memory(key, image)
+
+        if self._cache_dir is not None:
+            path = self._path(key)
+            # Writing to a temporary file first, so that readers never see a partial file
+            temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "wb") as file:
+                np.save(file, image)
+            os.replace(temporary_path, path)
+            with self._lock:
+                self._disk_bytes += os.path.getsize(path)
+                if self._disk_bytes > self._max_disk_bytes:
+                    self._evict_from_disk()
+
+    def clear(self) -> None:
+        """
+        Removes all the images from the in-memory tier. The on-disk tier is kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._num_bytes = 0
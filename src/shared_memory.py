@@ -0,0 +1,62 @@
+"""
+Shared Memory Helpers
+
+Helpers shared by the in-memory layouts of the generated images (see `dataset_export` and
+`batch_transport`): the alignment of the arrays inside a buffer, and the shared memory blocks
+which outlive the process creating them.
+"""
+import sys
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+# Alignment of the arrays inside the buffers, in bytes
+ALIGNMENT = 64
+
+
+def align(offset: int, alignment: int = ALIGNMENT) -> int:
+    """
+    Rounds up an offset to the next multiple of the alignment.
+
+    Args:
+        offset: Offset in bytes.
+        alignment: Alignment in bytes.
+    Returns:
+        int: The aligned offset.
+    """
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def open_shared_memory(name: str, size: int = 0, create: bool = False) -> SharedMemory:
+    """
+    Creates or attaches a shared memory block, which is not destroyed when the process exits.
+
+    Args:
+        name: Name of the shared memory block.
+        size: Size of the block in bytes, only used if `create` is True.
+        create: Creates a new block if True, otherwise attaches an existing block.
+    Returns:
+        SharedMemory: The shared memory block.
+
+    Notes:
+        By default, Python's resource tracker unlinks the blocks used by a process when it exits.
+        The block should be explicitly unlinked instead, once its content is not needed anymore.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, create=create, size=size, track=False)
+    # Python < 3.13 doesn't support the track argument
+    shm = SharedMemory(name=name, create=create, size=size)
+    resource_tracker.unregister(shm._name, "shared_memory")  # pylint: disable=protected-access
+    return shm
+
+
+def unlink_shared_memory(shm: SharedMemory) -> None:
+    """
+    Destroys a shared memory block opened with `open_shared_memory`.
+
+    Args:
+        shm: The shared memory block.
+    """
+    if sys.version_info < (3, 13):
+        # unlink() unregisters the block from the resource tracker, so it is registered back first
+        resource_tracker.register(shm._name, "shared_memory")  # pylint: disable=protected-access
+    shm.unlink()
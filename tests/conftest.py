@@ -3,7 +3,7 @@ import shutil
 
 import pytest
 import number_generator
-from number_generator import _load_data
+from number_generator import _load_data, SequenceGenerator
 
 
 @pytest.fixture(scope="module")
@@ -14,6 +14,13 @@ def images_labels():
     images, labels = _load_data(number_generator.DATA_PATH)
     return images, labels
 
+@pytest.fixture(scope="module")
+def generator(images_labels):
+    """
+    Fixture for a SequenceGenerator using the loaded images and labels.
+    """
+    return SequenceGenerator(glyphs=images_labels[0], class_indices=images_labels[1])
+
 @pytest.fixture(scope="function")
 def temporary_directory():
     """
@@ -0,0 +1,76 @@
+import multiprocessing
+import uuid
+
+import numpy as np
+import pytest
+from batch_transport import ImageBatch
+
+
+def _sum_batch(name, queue):
+    """
+    Attaches a batch in a child process and sends back the sum of its images and digits.
+    """
+    batch = ImageBatch.attach(name)
+    queue.put([(float(batch[i][0].sum()), batch.label(i).tolist()) for i in range(len(batch))])
+    batch.close()
+
+def test_case_1():
+    """
+    Check that the images and labels of different sizes can be read back as views of the buffer.
+    """
+    images = [np.full((28, 10), 0.5, dtype="float32"), np.arange(28 * 35, dtype="float32").reshape(28, 35)]
+    labels = [[0, 9, 0], [0, 3, 1, 2, 3, 4, 5, 6, 7, 8]]
+    batch = ImageBatch.pack(images, labels)
+    image, label = batch[1]
+    assert all((len(batch) == 2, batch.widths.tolist() == [10, 35], np.array_equal(batch[0][0], images[0]),
+                np.array_equal(image, images[1]), label.tolist() == labels[1], batch.label(0).tolist() == [0, 9, 0],
+                np.shares_memory(image, batch.images), batch.buffer.nbytes == ImageBatch.nbytes_for(images, labels)))
+
+def test_case_2():
+    """
+    Check that a batch is read from its raw bytes without pickling it.
+    """
+    batch = ImageBatch.pack([np.zeros((28, 12), dtype="float32")], [[5, 5]])
+    copy = ImageBatch(bytearray(batch.buffer))
+    assert all((len(copy) == 1, copy[0][0].shape == (28, 12), copy[-1][1].tolist() == [5, 5]))
+    with pytest.raises(IndexError):
+        copy[1]  # pylint: disable=pointless-statement
+    with pytest.raises(ValueError):
+        ImageBatch(bytearray(128))
+
+def test_case_3():
+    """
+    Check that a batch packed in shared memory is read by another process.
+    """
+    images = [np.ones((28, 20), dtype="float32"), np.ones((28, 7), dtype="float32")]
+    batch = ImageBatch.pack(images, [[1, 2], [3]], shared_memory_name=f"test_{uuid.uuid4().hex[:8]}")
+    try:
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=_sum_batch, args=(batch.name, queue))
+        process.start()
+        result = queue.get(timeout=60)
+        process.join()
+        assert result == [(28.0 * 20, [1, 2]), (28.0 * 7, [3])]
+    finally:
+        batch.close()
+        batch.unlink()
+
+def test_case_4():
+    """
+    Check if it raises a ValueError for a buffer which is too small.
+    """
+    with pytest.raises(ValueError):
+        ImageBatch.pack([np.zeros((28, 12), dtype="float32")], [[1]], buffer=bytearray(64))
+
+def test_case_5():
+    """
+    Check that no shared memory block is left behind when the batch can't be packed.
+    """
+    name = f"test_{uuid.uuid4().hex[:8]}"
+    with pytest.raises(ValueError):
+        ImageBatch.pack([np.zeros((20, 12), dtype="float32")], [[1]], shared_memory_name=name)
+    with pytest.raises(ValueError):
+        ImageBatch.pack([np.zeros((28, 12), dtype="float32")], [["x"]], shared_memory_name=name)
+    with pytest.raises(FileNotFoundError):
+        ImageBatch.attach(name)
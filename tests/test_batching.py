@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from batching import bucket_by_width, collate_batch, iter_padded_batches, padding_ratio
+
+
+def test_case_1():
+    """
+    Check that the images are padded to the widest image of the batch.
+    """
+    images = [np.zeros((28, 10), dtype="float32"), np.zeros((28, 25), dtype="float32")]
+    batch, widths = collate_batch(images)
+    assert all((batch.shape == (2, 28, 25), widths.tolist() == [10, 25],
+                np.all(batch[0, :, :10] == 0.0), np.all(batch[0, :, 10:] == 1.0)))
+
+def test_case_2():
+    """
+    Check that the batch is a contiguous view of the preallocated buffer.
+    """
+    buffer = np.empty(4 * 28 * 30, dtype="float32")
+    batch, _ = collate_batch([np.zeros((28, 12), dtype="float32")] * 3, out=buffer)
+    assert all((batch.shape == (3, 28, 12), batch.flags["C_CONTIGUOUS"], np.shares_memory(batch, buffer)))
+
+def test_case_3():
+    """
+    Check if it raises a ValueError for a buffer which is too small.
+    """
+    with pytest.raises(ValueError):
+        collate_batch([np.zeros((28, 12), dtype="float32")] * 3, out=np.empty(10, dtype="float32"))
+
+def test_case_4():
+    """
+    Check that bucketing by width reduces the padding.
+    """
+    widths = np.random.default_rng(0).integers(40, 200, size=256)
+    buckets = bucket_by_width(widths, batch_size=32)
+    naive = [np.arange(start, start + 32) for start in range(0, 256, 32)]
+    bucketed_padding = np.mean([padding_ratio(widths[indices]) for indices in buckets])
+    naive_padding = np.mean([padding_ratio(widths[indices]) for indices in naive])
+    assert all((sorted(np.concatenate(buckets).tolist()) == list(range(256)), bucketed_padding < naive_padding))
+
+def test_case_5(generator):
+    """
+    Check that natural-width images are packed into batches covering all the images.
+    """
+    images = [generator.generate_natural(digits=[1, 2, 3], spacing_range=(2, 5)) for _ in range(10)]
+    seen = []
+    for batch, widths, indices in iter_padded_batches(images, batch_size=4):
+        assert all(np.array_equal(batch[j, :, :width], images[i])
+                   for j, (i, width) in enumerate(zip(indices, widths)))
+        seen += indices.tolist()
+    assert sorted(seen) == list(range(10))
+
+def test_case_6():
+    """
+    Check if it raises a ValueError for a buffer which is not contiguous.
+    """
+    buffer = np.empty(2 * 4 * 28 * 30, dtype="float32")[::2]
+    with pytest.raises(ValueError):
+        collate_batch([np.zeros((28, 12), dtype="float32")] * 3, out=buffer)
+
+def test_case_7():
+    """
+    Check if it raises a ValueError for a batch size which is not positive.
+    """
+    with pytest.raises(ValueError, match="batch size"):
+        next(iter_padded_batches([np.zeros((28, 12), dtype="float32")], batch_size=-1))
@@ -0,0 +1,41 @@
+import uuid
+
+import numpy as np
+import pytest
+from dataset_export import NpyDataset, SharedMemoryDataset
+
+
+def test_case_1(temporary_directory):
+    """
+    Check that the samples written in the .npy files can be read back.
+    """
+    dataset = NpyDataset.create(temporary_directory, num_images=3, image_width=50)
+    dataset.write(0, np.full((28, 50), 0.5, dtype="float32"), np.array([0, 7, 0]))
+    dataset.close()
+
+    reader = NpyDataset.open(temporary_directory)
+    assert all((reader.ready == 1, reader.images.shape == (3, 28, 50),
+                np.all(reader.images[0] == 0.5), reader.labels[0].tolist() == [0, 7, 0] + [-1] * 8))
+
+def test_case_2():
+    """
+    Check that the samples written in the shared memory block are visible to an attached reader.
+    """
+    dataset = SharedMemoryDataset.create(f"test_{uuid.uuid4().hex[:8]}", num_images=2, image_width=40)
+    try:
+        reader = SharedMemoryDataset.attach(dataset.name)
+        assert reader.ready == 0
+        dataset.write(0, np.zeros((28, 40), dtype="float32"), np.array([0, 3, 1, 2, 3, 4, 5, 6, 7, 8]))
+        assert all((reader.ready == 1, reader.images.shape == (2, 28, 40), np.all(reader.images[0] == 0.0),
+                    reader.labels[0, :10].tolist() == [0, 3, 1, 2, 3, 4, 5, 6, 7, 8], reader.labels[0, 10] == -1))
+        reader.close()
+    finally:
+        dataset.close()
+        dataset.unlink()
+
+def test_case_3():
+    """
+    Check if it raises an error for a shared memory block which doesn't exist.
+    """
+    with pytest.raises(FileNotFoundError):
+        SharedMemoryDataset.attach(f"test_{uuid.uuid4().hex[:8]}")
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from glyph_metrics import compute_glyph_metrics, filter_glyphs
+
+
+def test_case_1():
+    """
+    Check the metrics of a glyph with a known bounding box.
+    """
+    glyphs = np.zeros((2, 28, 28), dtype="uint8")
+    glyphs[0, 5:10, 3:7] = 10
+    metrics = compute_glyph_metrics(glyphs)
+    assert all((metrics[0]["x_min"] == 3, metrics[0]["x_max"] == 6, metrics[0]["y_min"] == 5,
+                metrics[0]["y_max"] == 9, metrics[0]["width"] == 4, metrics[0]["height"] == 5,
+                metrics[0]["ink_mass"] == 200, metrics[0]["centroid_x"] == 4.5, metrics[0]["centroid_y"] == 7.0))
+
+def test_case_2():
+    """
+    Check that the metrics of an empty glyph are 0.
+    """
+    metrics = compute_glyph_metrics(np.zeros((1, 28, 28), dtype="uint8"))
+    assert all(metrics[0][field] == 0 for field in metrics.dtype.names)
+
+def test_case_3(images_labels):
+    """
+    Check that the horizontal bounds match the first and last ink columns of every glyph of the dataset.
+    """
+    images = images_labels[0]
+    metrics = compute_glyph_metrics(images)
+    columns = images.any(axis=1)
+    assert all((len(metrics) == len(images),
+                all(np.flatnonzero(column)[[0, -1]].tolist() == [x_min, x_max] if column.any() else x_max == 0
+                    for column, x_min, x_max in zip(columns, metrics["x_min"], metrics["x_max"]))))
+
+def test_case_4():
+    """
+    Check that the glyphs are filtered by their width and ink mass.
+    """
+    glyphs = np.zeros((3, 28, 28), dtype="uint8")
+    glyphs[0, :, 0:2] = 1
+    glyphs[1, :, 0:10] = 1
+    glyphs[2, :, 0:10] = 255
+    mask = filter_glyphs(compute_glyph_metrics(glyphs), min_width=5, max_ink_mass=1000)
+    assert mask.tolist() == [False, True, False]
+
+def test_case_5():
+    """
+    Check if it raises a ValueError for glyphs which are not a 3-D array.
+    """
+    with pytest.raises(ValueError):
+        compute_glyph_metrics(np.zeros((28, 28), dtype="uint8"))
+
+def test_case_6():
+    """
+    Check that the bounds of glyphs wider than 127 pixels don't overflow.
+    """
+    glyphs = np.zeros((1, 28, 300), dtype="uint8")
+    glyphs[0, 2:20, 100:250] = 1
+    metrics = compute_glyph_metrics(glyphs)
+    assert all((metrics[0]["x_min"] == 100, metrics[0]["x_max"] == 249, metrics[0]["width"] == 150,
+                metrics[0]["height"] == 18))
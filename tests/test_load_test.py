@@ -0,0 +1,91 @@
+import os
+from glob import glob
+
+import numpy as np
+import pytest
+from dataset_export import SharedMemoryDataset
+from load_test import (compare_to_baseline, config_key, load_baseline, run_configuration, run_load_test,
+                       save_baseline)
+
+
+def _result(num_workers, num_images, images_per_sec):
+    return {"workers": num_workers, "num_images": num_images, "images_per_sec": images_per_sec}
+
+
+def _draw_numbers(num_images, output_path, stage_times):
+    """
+    Saves random numbers drawn from the global random number generator of a worker.
+    """
+    np.save(os.path.join(output_path, "draws.npy"), np.random.random(num_images))
+
+
+def _fail_after_writing(num_images, output_path, stage_times):
+    """
+    Creates the shared memory block of a worker, and fails in the worker with 3 images.
+    """
+    dataset = SharedMemoryDataset.create(output_path, num_images, 10)
+    dataset.close()
+    if num_images == 3:
+        raise RuntimeError("worker failed")
+
+
+def test_case_1():
+    """
+    Check that a throughput drop beyond the tolerance is reported as a regression.
+    """
+    baseline = {config_key(1, 100): _result(1, 100, 1000.0), config_key(2, 100): _result(2, 100, 1000.0)}
+    regressions = compare_to_baseline([_result(1, 100, 850.0), _result(2, 100, 700.0)], baseline, tolerance=0.2)
+    assert all((len(regressions) == 1, regressions[0].startswith(config_key(2, 100))))
+
+def test_case_2():
+    """
+    Check that the configurations missing from the baseline are skipped.
+    """
+    assert compare_to_baseline([_result(4, 100, 1.0)], {}, tolerance=0.2) == []
+
+def test_case_3(temporary_directory):
+    """
+    Check that a saved baseline can be loaded back.
+    """
+    path = os.path.join(temporary_directory, "baseline.json")
+    save_baseline(path, [_result(1, 100, 1000.0)])
+    assert load_baseline(path) == {config_key(1, 100): _result(1, 100, 1000.0)}
+
+def test_case_4(temporary_directory):
+    """
+    Check that the workers draw different random numbers, and that the throughput is measured on the wall time.
+    """
+    result = run_configuration(_draw_numbers, num_workers=3, num_images=12, output_format="npy",
+                               work_dir=temporary_directory)
+    draws = [np.load(path).tolist() for path in glob(os.path.join(temporary_directory, "*", "draws.npy"))]
+    assert all((len(draws) == 3, len({tuple(draw) for draw in draws}) == 3,
+                result["images_per_sec"] == pytest.approx(12 / result["wall_seconds"])))
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="The shared memory blocks are listed in /dev/shm")
+def test_case_5(temporary_directory):
+    """
+    Check that the shared memory blocks of all the workers are destroyed when a worker fails.
+    """
+    before = set(glob("/dev/shm/load_test_*"))
+    with pytest.raises(RuntimeError):
+        run_configuration(_fail_after_writing, num_workers=2, num_images=5, output_format="shm",
+                          work_dir=temporary_directory)
+    assert set(glob("/dev/shm/load_test_*")) == before
+
+def test_case_6():
+    """
+    Check that a baseline measured with other settings is not compared.
+    """
+    baseline = {config_key(1, 100): dict(_result(1, 100, 1000.0), settings={"output_format": "npy"})}
+    with pytest.raises(ValueError):
+        compare_to_baseline([dict(_result(1, 100, 1000.0), settings={"output_format": "png"})], baseline, 0.2)
+
+def test_case_7(temporary_directory):
+    """
+    Check that the outputs are written inside the work directory, and that the settings and total memory are reported.
+    """
+    results = run_load_test(_draw_numbers, [2], [4], settings={"image_width": 100}, work_dir=temporary_directory)
+    assert all((results[0]["settings"] == {"output_format": "npy", "image_width": 100},
+                results[0]["total_peak_memory_mb"] > results[0]["peak_memory_mb"],
+                os.listdir(temporary_directory) == []))
@@ -1,7 +1,14 @@
+import importlib
+import json
 import os.path
 import subprocess
+import uuid
 from glob import glob
 
+import numpy as np
+import pytest
+from dataset_export import SharedMemoryDataset
+
 
 def test_case_1(temporary_directory):
     """
@@ -219,4 +226,121 @@ def test_case_10(temporary_directory):
         "--num-images", f"{num_images}"
     ])
 
-    assert (execution.returncode != 0)
\ No newline at end of file
+    assert (execution.returncode != 0)
+
+def test_case_11(temporary_directory):
+    """
+    Checks the execution of CLI-2 with the memory-mapped .npy output format.
+    """
+    min_space = 2
+    max_space = 4
+    image_width = 100
+    num_images = 10
+    output_path = temporary_directory
+
+    execution = subprocess.run([
+        "python", "-m", "number-generator-script",
+        "generate-phone-numbers",
+        "--min-space", f"{min_space}",
+        "--max-space", f"{max_space}",
+        "--image-width", f"{image_width}",
+        "--output-path", f"{output_path}",
+        "--num-images", f"{num_images}",
+        "--output-format", "npy"
+    ])
+
+    images = np.load(os.path.join(temporary_directory, "images.npy"), mmap_mode="r")
+    ready = np.load(os.path.join(temporary_directory, "ready.npy"))
+    assert all((execution.returncode == 0, images.shape == (num_images, 28, image_width), ready[0] == num_images))
+
+def test_case_12(temporary_directory):
+    """
+    Checks the execution of CLI-3, and that it fails when the throughput drops below the baseline.
+    """
+    baseline = os.path.join(temporary_directory, "baseline.json")
+    command = [
+        "python", "-m", "number-generator-script",
+        "load-test",
+        "--workers", "1",
+        "--workers", "2",
+        "--num-images", "10",
+        "--baseline", baseline
+    ]
+
+    update_execution = subprocess.run(command + ["--update-baseline"])
+    with open(baseline, encoding="utf-8") as file:
+        measures = json.load(file)
+    for measure in measures.values():
+        measure["images_per_sec"] *= 1000
+    with open(baseline, "w", encoding="utf-8") as file:
+        json.dump(measures, file)
+    compare_execution = subprocess.run(command)
+
+    assert all((update_execution.returncode == 0, len(measures) == 2, compare_execution.returncode != 0))
+
+def test_case_13():
+    """
+    Checks the execution of CLI-2 with the shared memory output format, and that the block can be destroyed.
+    """
+    name = f"test_{uuid.uuid4().hex[:8]}"
+    execution = subprocess.run([
+        "python", "-m", "number-generator-script",
+        "generate-phone-numbers",
+        "--min-space", "2",
+        "--max-space", "4",
+        "--image-width", "60",
+        "--output-path", name,
+        "--num-images", "3",
+        "--output-format", "shm"
+    ])
+
+    dataset = SharedMemoryDataset.attach(name)
+    ready, shape = dataset.ready, dataset.images.shape
+    dataset.close()
+    dataset.unlink()
+    assert all((execution.returncode == 0, ready == 3, shape == (3, 28, 60)))
+
+def test_case_14():
+    """
+    Checks the CLI-2 fails with an invalid shared memory block name.
+    """
+    execution = subprocess.run([
+        "python", "-m", "number-generator-script",
+        "generate-phone-numbers",
+        "--min-space", "2",
+        "--max-space", "4",
+        "--image-width", "60",
+        "--output-path", ".",
+        "--num-images", "3",
+        "--output-format", "shm"
+    ])
+
+    assert (execution.returncode != 0)
+
+def test_case_15(monkeypatch):
+    """
+    Checks that the shared memory block is destroyed when the generation fails.
+    """
+    script = importlib.import_module("number-generator-script")
+    def failing_noise(image):
+        raise RuntimeError("noise failed")
+    monkeypatch.setattr(script, "add_noise", failing_noise)
+    name = f"test_{uuid.uuid4().hex[:8]}"
+    with pytest.raises(RuntimeError):
+        script.generate_phone_number((2, 4), 60, name, 3, output_format="shm", show_progress=False)
+    with pytest.raises(FileNotFoundError):
+        SharedMemoryDataset.attach(name)
+
+def test_case_16():
+    """
+    Checks the CLI-3 fails with a tolerance outside of [0, 1).
+    """
+    execution = subprocess.run([
+        "python", "-m", "number-generator-script",
+        "load-test",
+        "--workers", "1",
+        "--num-images", "2",
+        "--tolerance", "1.5"
+    ])
+
+    assert (execution.returncode != 0)
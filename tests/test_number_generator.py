@@ -1,7 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pytest
-import number_generator
-from number_generator import _load_data, _get_image, generate_numbers_sequence
+from number_generator import (_load_data, generate_numbers_sequence, SequenceGenerator,
+                              InvalidDigitsError, InvalidSeedError, InvalidSpacingError, InvalidWidthError)
 
 
 # Test cases for _load_data
@@ -20,105 +22,161 @@ def test_case_2():
     with pytest.raises(ValueError):
         _ = _load_data('../MNIST_DATA_PATH')
 
-# Test cases for _get_image
-def test_case_3(images_labels):
-    """
-    Check if _get_image returns the correct image with a valid index.
-    """
-    image = _get_image(images_labels[0], 0)
-    image = image.astype(bool)
-    _x_cords = np.where(image == True)[1]
-    assert all((0 in _x_cords, image.shape[1]-1 in _x_cords))
-
-def test_case_4(images_labels):
-    """
-    Check if _get_image raises a ValueError for an invalid index.
-    """
-    with pytest.raises(ValueError):
-        _ = _get_image(images_labels[1], 0)
-
-# Test cases for generate_numbers_sequence
-def test_case_5(images_labels):
+# Test cases for SequenceGenerator
+def test_case_3(generator):
     """
     Check the dtype of the generated image.
     """
-    number_generator.IMAGES = images_labels[0]
-    number_generator.LABELS = images_labels[1]
-    image = generate_numbers_sequence(digits=[1, 2, 3],
-                                      spacing_range=(2, 5),
-                                      image_width=50)
+    image = generator.generate(digits=[1, 2, 3],
+                               spacing_range=(2, 5),
+                               image_width=50)
     assert image.dtype == np.float32
 
-def test_case_6(images_labels):
+def test_case_4(generator):
     """
     Check the shape of the generated image.
     """
-    number_generator.IMAGES = images_labels[0]
-    number_generator.LABELS = images_labels[1]
-
     width = 50
-    image = generate_numbers_sequence(digits=[1, 2, 3],
-                                      spacing_range=(2, 5),
-                                      image_width=width)
+    image = generator.generate(digits=[1, 2, 3],
+                               spacing_range=(2, 5),
+                               image_width=width)
     assert image.shape == (28, width)
 
-def test_case_7(images_labels):
+def test_case_5(generator):
     """
     Check the range of the generated image.
     """
-    number_generator.IMAGES = images_labels[0]
-    number_generator.LABELS = images_labels[1]
-
     width = 50
-    image = generate_numbers_sequence(digits=[1, 2, 3],
-                                      spacing_range=(2, 5),
-                                      image_width=width)
+    image = generator.generate(digits=[1, 2, 3],
+                               spacing_range=(2, 5),
+                               image_width=width)
     assert all((np.min(image) >= 0.0, np.max(image) <= 1.0))
 
-def test_case_8(images_labels):
+def test_case_6(generator):
     """
     Check if it raises a ValueError for an invalid input.
     """
     with pytest.raises(ValueError):
-        number_generator.IMAGES = images_labels[0]
-        number_generator.LABELS = images_labels[1]
-
-        generate_numbers_sequence(digits=[],
-                                  spacing_range=(2, 5),
-                                  image_width=50)
+        generator.generate(digits=[],
+                           spacing_range=(2, 5),
+                           image_width=50)
 
-def test_case_9(images_labels):
+def test_case_7(generator):
     """
     Check if it raises a ValueError for an invalid input.
     """
     with pytest.raises(ValueError):
-        number_generator.IMAGES = images_labels[0]
-        number_generator.LABELS = images_labels[1]
+        generator.generate(digits=[1, 1, 12],
+                           spacing_range=(2, 5),
+                           image_width=50)
 
-        generate_numbers_sequence(digits=[1, 1, 12],
-                                  spacing_range=(2, 5),
-                                  image_width=50)
+def test_case_8(generator):
+    """
+    Check if it raises a ValueError for an invalid input.
+    """
+    with pytest.raises(ValueError):
+        generator.generate(digits=[1, 2],
+                           spacing_range=(),
+                           image_width=50)
 
-def test_case_10(images_labels):
+def test_case_9(generator):
     """
     Check if it raises a ValueError for an invalid input.
     """
     with pytest.raises(ValueError):
-        number_generator.IMAGES = images_labels[0]
-        number_generator.LABELS = images_labels[1]
+        generator.generate(digits=[1, 2],
+                           spacing_range=(2, 5),
+                           image_width=None)
 
-        generate_numbers_sequence(digits=[1, 2],
-                                  spacing_range=(),
-                                  image_width=50)
+def test_case_10(generator):
+    """
+    Check that a generator can be shared across a thread pool.
+    """
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        images = list(executor.map(lambda _: generator.generate(digits=[4, 5, 6], spacing_range=(2, 5),
+                                                                image_width=60), range(32)))
+    assert all(image.shape == (28, 60) for image in images)
 
 def test_case_11(images_labels):
     """
-    Check if it raises a ValueError for an invalid input.
+    Check that two generators with the same seed generate the same images.
+    """
+    images = [SequenceGenerator(seed=7, glyphs=images_labels[0], class_indices=images_labels[1])
+              .generate(digits=[7, 8, 9], spacing_range=(2, 5), image_width=50) for _ in range(2)]
+    assert np.array_equal(images[0], images[1])
+
+def test_case_12():
+    """
+    Check that the generate_numbers_sequence function generates an image with the default generator.
+    """
+    image = generate_numbers_sequence(digits=[1, 2, 3], spacing_range=(2, 5), image_width=50)
+    assert image.shape == (28, 50)
+
+def test_case_13(generator):
+    """
+    Check if it raises an InvalidDigitsError for digits out of range.
+    """
+    with pytest.raises(InvalidDigitsError):
+        generator.generate(digits=[1, -1, 3],
+                           spacing_range=(2, 5),
+                           image_width=50)
+
+def test_case_14(generator):
+    """
+    Check if it raises an InvalidSpacingError for a minimum spacing greater than the maximum.
+    """
+    with pytest.raises(InvalidSpacingError):
+        generator.generate(digits=[1, 2, 3],
+                           spacing_range=(5, 2),
+                           image_width=50)
+
+def test_case_15(generator):
+    """
+    Check if it raises an InvalidWidthError for a non-positive image width.
+    """
+    with pytest.raises(InvalidWidthError):
+        generator.generate(digits=[1, 2, 3],
+                           spacing_range=(2, 5),
+                           image_width=0)
+
+def test_case_16(generator):
+    """
+    Check that the natural-width image is not resized.
+    """
+    image = generator.generate_natural(digits=[1, 2, 3], spacing_range=(2, 5), seed=0)
+    resized = generator.generate(digits=[1, 2, 3], spacing_range=(2, 5), image_width=image.shape[1], seed=0)
+    assert all((image.dtype == np.float32, image.shape[0] == 28, np.array_equal(image, resized)))
+
+def test_case_17(images_labels):
+    """
+    Check if it raises a ValueError for glyphs given without their class indices.
     """
     with pytest.raises(ValueError):
-        number_generator.IMAGES = images_labels[0]
-        number_generator.LABELS = images_labels[1]
+        SequenceGenerator(glyphs=images_labels[0])
+
+def test_case_18(generator):
+    """
+    Check if it raises an InvalidDigitsError for digits which are not iterable or not a flat sequence.
+    """
+    with pytest.raises(InvalidDigitsError):
+        generator.generate(digits=5, spacing_range=(2, 5), image_width=50)
+    with pytest.raises(InvalidDigitsError):
+        generator.generate(digits=[[1], [2, 3]], spacing_range=(2, 5), image_width=50)
 
-        generate_numbers_sequence(digits=[1, 2],
-                                  spacing_range=(2, 5),
-                                  image_width=None)
\ No newline at end of file
+def test_case_19(generator):
+    """
+    Check if it raises an InvalidSeedError for a seed which is not a non-negative integer.
+    """
+    for seed in (3.7, -1, True):
+        with pytest.raises(InvalidSeedError):
+            generator.generate(digits=[1, 2], spacing_range=(2, 5), image_width=50, seed=seed)
+    with pytest.raises(InvalidSeedError):
+        generator.generate_natural(digits=[1, 2], spacing_range=(2, 5), seed=-1)
+
+def test_case_20(generator):
+    """
+    Check that the natural width of a single glyph is its stored width, with all its ink columns.
+    """
+    image = generator.generate_natural(digits=[7], spacing_range=(2, 5), seed=0)
+    widths = generator.metrics["width"][generator._class_indices[7]]  # pylint: disable=protected-access
+    assert all((image.shape[1] in set(widths.tolist()), np.any(image[:, -1] < 1.0), np.any(image[:, 0] < 1.0)))
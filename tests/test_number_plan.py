@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from number_plan import JP_AREA_CODES, MOBILE_CODES, sample_phone_numbers, split_phone_number
+
+
+def test_case_1():
+    """
+    Check the shape and the padding of the sampled phone numbers.
+    """
+    digits, part_sizes = sample_phone_numbers(1000, rng=np.random.default_rng(0))
+    total_size = part_sizes.sum(axis=1)
+    assert all((digits.shape == (1000, 11), part_sizes.shape == (1000, 3),
+                np.all((total_size == 10) | (total_size == 11)),
+                np.all((digits >= 0) == (np.arange(11) < total_size[:, None]))))
+
+def test_case_2():
+    """
+    Check that the phone numbers start with 0 and that mobile numbers use a mobile code.
+    """
+    digits, part_sizes = sample_phone_numbers(1000, rng=np.random.default_rng(1))
+    mobile = part_sizes.sum(axis=1) == 11
+    codes = {''.join(map(str, row[:3])) for row in digits[mobile]}
+    assert all((np.all(digits[:, 0] == 0), codes <= set(MOBILE_CODES)))
+
+def test_case_3():
+    """
+    Check that only the types with a positive weight are generated.
+    """
+    digits, part_sizes = sample_phone_numbers(500, type_weights=(0, 0, 0, 0, 0, 1))
+    assert all((np.all(part_sizes == (3, 4, 4)), np.all(digits[:, -1] >= 0)))
+
+def test_case_4():
+    """
+    Check that the area codes are picked from the given table.
+    """
+    digits, part_sizes = sample_phone_numbers(500, type_weights=(1, 1, 1, 1, 1, 0), area_codes=JP_AREA_CODES)
+    codes = {''.join(map(str, row[:size])) for row, size in zip(digits, part_sizes[:, 0])}
+    table = {code for table in JP_AREA_CODES.values() for code in table}
+    assert codes <= table
+
+def test_case_5():
+    """
+    Check that every digit appears the same number of times over the whole phone numbers with balanced
+    digits, except the 0 which is over-represented by the fixed leading 0 and mobile codes.
+    """
+    digits, part_sizes = sample_phone_numbers(10000, balanced_digits=True, rng=np.random.default_rng(2))
+    counts = np.bincount(digits[digits >= 0], minlength=10)
+    landline = part_sizes.sum(axis=1) == 10
+    area_digits = digits[landline][np.arange(11) < part_sizes[landline, :1]]
+    assert all((counts[1:].max() - counts[1:].min() <= 1, counts[0] >= counts[1:].max(),
+                np.all(digits[:, 0] == 0), np.count_nonzero(area_digits) == area_digits.size - landline.sum()))
+
+def test_case_6():
+    """
+    Check that a row can be split back into the 3 parts of the phone number.
+    """
+    digits, part_sizes = sample_phone_numbers(100)
+    area_code, exchange_number, subscriber_number = split_phone_number(digits[0], part_sizes[0])
+    assert all((len(area_code) == part_sizes[0, 0], len(exchange_number) == part_sizes[0, 1],
+                len(subscriber_number) == 4))
+
+def test_case_7():
+    """
+    Check if it raises a ValueError for invalid type weights.
+    """
+    with pytest.raises(ValueError):
+        sample_phone_numbers(10, type_weights=(1, 1, 1))
+
+def test_case_8():
+    """
+    Check that all the digits are balanced when the fixed digits don't over-represent the 0.
+    """
+    digits, _ = sample_phone_numbers(1000, type_weights=(1, 1, 1, 1, 1, 0), balanced_digits=True)
+    counts = np.bincount(digits[digits >= 0], minlength=10)
+    assert counts.max() - counts.min() <= 1
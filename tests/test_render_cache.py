@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pytest
+from number_generator import SequenceGenerator, generate_numbers_sequence, set_render_cache
+from render_cache import RenderCache
+
+
+def test_case_1():
+    """
+    Check that the least recently used image is evicted once the cache is full.
+    """
+    cache = RenderCache(max_entries=2)
+    cache.put("a", np.zeros((28, 10), dtype="float32"))
+    cache.put("b", np.zeros((28, 10), dtype="float32"))
+    cache.get("a")
+    cache.put("c", np.zeros((28, 10), dtype="float32"))
+    assert all((len(cache) == 2, cache.get("a") is not None, cache.get("b") is None, cache.get("c") is not None))
+
+def test_case_2():
+    """
+    Check that the cache is bounded by the total size of the images.
+    """
+    image = np.zeros((28, 100), dtype="float32")
+    cache = RenderCache(max_bytes=2 * image.nbytes)
+    for key in range(5):
+        cache.put(key, image)
+    assert len(cache) == 2
+
+def test_case_3():
+    """
+    Check that the cached images can't be modified through the returned copies.
+    """
+    cache = RenderCache()
+    cache.put("a", np.ones((28, 10), dtype="float32"))
+    cache.get("a")[:] = 0.0
+    assert np.all(cache.get("a") == 1.0)
+
+def test_case_4(temporary_directory):
+    """
+    Check that the images are found in the on-disk tier by a new cache.
+    """
+    image = np.random.rand(28, 50).astype("float32")
+    RenderCache(cache_dir=temporary_directory).put(((1, 2), (2, 5), 50, 0), image)
+    assert np.array_equal(RenderCache(cache_dir=temporary_directory).get(((1, 2), (2, 5), 50, 0)), image)
+
+def test_case_5(images_labels):
+    """
+    Check that the images generated with a seed are cached, and that the ones without a seed are not.
+    """
+    cache = RenderCache()
+    generator = SequenceGenerator(glyphs=images_labels[0], class_indices=images_labels[1], cache=cache)
+    first = generator.generate(digits=[1, 2, 3], spacing_range=(2, 5), image_width=50, seed=3)
+    second = generator.generate(digits=[1, 2, 3], spacing_range=(2, 5), image_width=50, seed=3)
+    generator.generate(digits=[1, 2, 3], spacing_range=(2, 5), image_width=50)
+    assert all((np.array_equal(first, second), len(cache) == 1))
+
+def test_case_6():
+    """
+    Check if it raises a ValueError for an invalid size.
+    """
+    with pytest.raises(ValueError):
+        RenderCache(max_entries=0)
+
+def test_case_7(temporary_directory):
+    """
+    Check that the least recently used files are removed once the on-disk tier exceeds its size.
+    """
+    image = np.zeros((28, 50), dtype="float32")
+    file_size = 128 + image.nbytes
+    cache = RenderCache(cache_dir=temporary_directory, max_disk_bytes=2 * file_size)
+    for key in ("a", "b", "c"):
+        cache.put(key, image)
+    cache.clear()
+    assert all((len(os.listdir(temporary_directory)) == 2, cache.get("a") is None, cache.get("c") is not None))
+
+def test_case_8():
+    """
+    Check that the default generator caches the images of generate_numbers_sequence, with a normalized seed.
+    """
+    cache = RenderCache()
+    set_render_cache(cache)
+    try:
+        first = generate_numbers_sequence([1, 2, 3], (2, 5), 50, seed=3)
+        second = generate_numbers_sequence([1, 2, 3], (2, 5), 50, seed=np.int64(3))
+    finally:
+        set_render_cache(None)
+    assert all((np.array_equal(first, second), len(cache) == 1))